@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'GroupBuy.settings')
+# Serve the read-heavy pages with their async views under ASGI (set to 0 to opt out).
+os.environ.setdefault('ASYNC_READ_VIEWS', '1')
 
 application = get_asgi_application()
@@ -0,0 +1,20 @@
+"""
+Jinja2 environment for the templates under <app>/jinja2/ (see LISTING_TEMPLATE_ENGINE).
+"""
+
+from django.templatetags.static import static
+from django.urls import reverse
+from jinja2 import Environment
+
+
+def url(viewname, *args, **kwargs):
+    return reverse(viewname, args=args or None, kwargs=kwargs or None)
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update({
+        "static": static,
+        "url": url,
+    })
+    return env
@@ -48,6 +48,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so queries run by the middleware below are attributed to the request's view too.
+    'main.slow_queries.slow_query_middleware',
+    'main.request_profiler.ProfilingMiddleware',
+    'main.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -55,16 +59,21 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'main.ratelimit.RateLimitMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'GroupBuy.urls'
 
+# The product grid (products/product_list.html) is the most rendered template. Set
+# LISTING_TEMPLATE_ENGINE=jinja2 to render it from products/jinja2/ with the
+# optional Jinja2 backend (pip install Jinja2); every other page stays on Django templates.
+LISTING_TEMPLATE_ENGINE = os.environ.get("LISTING_TEMPLATE_ENGINE", "django")
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -72,11 +81,121 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compile each template once per process. The autoreloader clears
+            # the cache when a template changes under runserver.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
+if LISTING_TEMPLATE_ENGINE == "jinja2":
+    TEMPLATES.append({
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'environment': 'GroupBuy.jinja2.environment',
+        },
+    })
+
 WSGI_APPLICATION = 'GroupBuy.wsgi.application'
+ASGI_APPLICATION = 'GroupBuy.asgi.application'
+
+# Route the read-heavy pages (home, catalog, product detail, search, group list) to
+# their async-ORM versions. GroupBuy/asgi.py turns this on by default.
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "0") == "1"
+
+# Identifies the deployed code; part of every page ETag (main/conditional.py) so a
+# deploy never answers 304 for a page rendered by older templates.
+RELEASE_VERSION = os.environ.get("RELEASE_VERSION", os.environ.get("RAILWAY_GIT_COMMIT_SHA", ""))
+
+# Shared cache (page cache, counters, rate limits, sessions). Set REDIS_URL when running
+# several processes: the local-memory fallback is per process, so an invalidation only
+# reaches the worker that made it and cached pages are kept briefly instead.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Where sessions live. "db" reads django_session on every signed-in request; "cached_db"
+# serves reads from the cache and only writes through to the database; "signed_cookies"
+# keeps the (signed, not encrypted) session in the browser, so nothing is stored server
+# side and a logged-out cookie stays valid until it expires. cached_db needs a shared
+# cache, so it is the default only with REDIS_URL.
+SESSION_MODE = os.environ.get("SESSION_MODE", "cached_db" if os.environ.get("REDIS_URL") else "db")
+SESSION_ENGINE = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}[SESSION_MODE]
+
+# Flash messages ride in a signed cookie and never touch the session.
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+
+# Seconds an anonymous page stays in the page cache (main/page_cache.py); 0 disables it.
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", 300 if os.environ.get("REDIS_URL") else 30))
+
+# Trending scores (products/popularity.py) halve every this many hours.
+POPULARITY_HALF_LIFE_HOURS = float(os.environ.get("POPULARITY_HALF_LIFE_HOURS", 72))
+
+# Product views are counted in memory and written in batches (products/view_counter.py):
+# every this many seconds, or as soon as this many views are waiting in a worker.
+VIEW_COUNTER_FLUSH_INTERVAL = float(os.environ.get("VIEW_COUNTER_FLUSH_INTERVAL", 10))
+VIEW_COUNTER_MAX_PENDING = int(os.environ.get("VIEW_COUNTER_MAX_PENDING", 1000))
+
+# Admin changelists (main/paginators.py) show PostgreSQL's row estimate instead of an exact
+# COUNT(*) for unfiltered tables larger than this.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get("ADMIN_ESTIMATED_COUNT_THRESHOLD", 100000))
+
+# Token-bucket rate limits (main/ratelimit.py): URL name -> "count/period" (s, m, h) per scope
+# ("user" or "ip"), and the methods that count (all when omitted). Blocked requests get a 429.
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMITS = {
+    "accounts:sign_in": {"ip": "10/m", "methods": ["POST"]},
+    "orders:create_order_view": {"user": "20/m", "ip": "60/m", "methods": ["POST"]},
+    "orders:join_group_purchase": {"user": "10/m", "ip": "60/m"},
+}
+# Proxies in front of the app that append the client address to X-Forwarded-For (Railway has one).
+RATE_LIMIT_PROXY_COUNT = int(os.environ.get("RATE_LIMIT_PROXY_COUNT", 1 if os.environ.get("RAILWAY_ENVIRONMENT") else 0))
+
+# /metrics (main/metrics.py) requires "Authorization: Bearer <METRICS_TOKEN>" when set.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Slow query log (main/slow_queries.py). Off unless SLOW_QUERY_MS is set: queries over it
+# are appended to SLOW_QUERY_LOG in SLOW_QUERY_LOG_DIR with their view, origin and EXPLAIN
+# plan. Read it with `python manage.py slow_query_report`.
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 0))
+SLOW_QUERY_LOG_DIR = os.environ.get("SLOW_QUERY_LOG_DIR", BASE_DIR / "logs")
+SLOW_QUERY_LOG = os.path.join(SLOW_QUERY_LOG_DIR, "slow_queries.jsonl")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get("SLOW_QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024))
+SLOW_QUERY_EXPLAIN_INTERVAL = 600
+
+# Slow request profiler (main/request_profiler.py). Off unless PROFILING=1 or switched on
+# in the admin ("Profiling switches"), which overrides these and is re-read every
+# PROFILING_SWITCH_REFRESH seconds. Profiles go to PROFILING_DIR, newest PROFILING_MAX_FILES kept.
+PROFILING_ENABLED = os.environ.get("PROFILING", "0") == "1"
+PROFILING_THRESHOLD_MS = int(os.environ.get("PROFILING_THRESHOLD_MS", 1000))
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", 0))
+PROFILING_INTERVAL_MS = float(os.environ.get("PROFILING_INTERVAL_MS", 5))
+PROFILING_DIR = os.environ.get("PROFILING_DIR", BASE_DIR / "profiles")
+PROFILING_MAX_FILES = int(os.environ.get("PROFILING_MAX_FILES", 200))
+PROFILING_SWITCH_REFRESH = 10
+
+# Benchmarking only: add this many milliseconds to every database query.
+SIMULATED_DB_LATENCY_MS = float(os.environ.get("SIMULATED_DB_LATENCY_MS", 0))
 
 
 # Database
@@ -143,6 +262,19 @@ STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]
 
+# collectstatic (run at build time) writes hashed, pre-compressed copies and a
+# staticfiles.json manifest to STATIC_ROOT. Once the manifest exists WhiteNoise
+# serves only the collected files (hashed names get a 10-year immutable
+# Cache-Control) and no longer rescans the source directories on each request.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "main.storage.StaticStorage"},
+}
+STATIC_MANIFEST = os.path.exists(os.path.join(STATIC_ROOT, "staticfiles.json"))
+WHITENOISE_AUTOREFRESH = DEBUG and not STATIC_MANIFEST
+WHITENOISE_USE_FINDERS = DEBUG  # indexed once at startup; serves files added since the last collectstatic
+WHITENOISE_MAX_AGE = 3600 if STATIC_MANIFEST else 0
+
 
 
 # Default primary key field type
@@ -159,3 +291,29 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
 
+
+# Payments (see orders/payments.py)
+# PAYMENT_QUEUE: "thread" authorizes on an in-process thread pool, "worker" leaves
+# payments queued for `manage.py process_payments`, "inline" authorizes after commit.
+PAYMENT_GATEWAY = os.environ.get("PAYMENT_GATEWAY", "orders.payments.MockGateway")
+PAYMENT_QUEUE = os.environ.get("PAYMENT_QUEUE", "thread")
+PAYMENT_THREAD_WORKERS = int(os.environ.get("PAYMENT_THREAD_WORKERS", 4))
+PAYMENT_MOCK_LATENCY = float(os.environ.get("PAYMENT_MOCK_LATENCY", 0.5))
+PAYMENT_MOCK_FAILURE_RATE = float(os.environ.get("PAYMENT_MOCK_FAILURE_RATE", 0.05))
+# Thread mode: each process sweeps this often for payments lost with a recycled worker.
+PAYMENT_SWEEP_INTERVAL = float(os.environ.get("PAYMENT_SWEEP_INTERVAL", 60))
+PAYMENT_REQUEUE_AFTER = int(os.environ.get("PAYMENT_REQUEUE_AFTER", 300))
+
+
+# Bulk product imports (see products/imports.py)
+# PRODUCT_IMPORT_QUEUE: "thread" imports on a background thread in the web process, "worker"
+# leaves imports queued for `manage.py process_imports`, "inline" imports after commit.
+PRODUCT_IMPORT_QUEUE = os.environ.get("PRODUCT_IMPORT_QUEUE", "thread")
+PRODUCT_IMPORT_BATCH_SIZE = int(os.environ.get("PRODUCT_IMPORT_BATCH_SIZE", 500))
+PRODUCT_IMPORT_MAX_ERRORS = int(os.environ.get("PRODUCT_IMPORT_MAX_ERRORS", 1000))
+# Upload caps: the CSV, the images zip, and each image once unzipped.
+PRODUCT_IMPORT_MAX_CSV_BYTES = int(os.environ.get("PRODUCT_IMPORT_MAX_CSV_BYTES", 50 * 1024 * 1024))
+PRODUCT_IMPORT_MAX_ZIP_BYTES = int(os.environ.get("PRODUCT_IMPORT_MAX_ZIP_BYTES", 200 * 1024 * 1024))
+PRODUCT_IMPORT_MAX_IMAGE_BYTES = int(os.environ.get("PRODUCT_IMPORT_MAX_IMAGE_BYTES", 10 * 1024 * 1024))
+PRODUCT_IMPORT_SWEEP_INTERVAL = float(os.environ.get("PRODUCT_IMPORT_SWEEP_INTERVAL", 60))
+PRODUCT_IMPORT_REQUEUE_AFTER = int(os.environ.get("PRODUCT_IMPORT_REQUEUE_AFTER", 600))
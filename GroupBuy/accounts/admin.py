@@ -3,5 +3,16 @@ from .models import Profile_Seller, Profile_User
 
 # Register your models here.
 
-admin.site.register(Profile_Seller)
-admin.site.register(Profile_User)
+
+@admin.register(Profile_Seller)
+class ProfileSellerAdmin(admin.ModelAdmin):
+    list_select_related = ('user',)
+    search_fields = ('=user__username',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(Profile_User)
+class ProfileUserAdmin(admin.ModelAdmin):
+    list_select_related = ('user',)
+    search_fields = ('=user__username',)
+    raw_id_fields = ('user',)
@@ -1,3 +1,28 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+
+@override_settings(RATE_LIMIT_ENABLED=True)
+class SignInRateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def sign_in(self, address):
+        return self.client.post(
+            reverse('accounts:sign_in'), {'username': 'nobody', 'password': 'wrong'}, REMOTE_ADDR=address,
+        )
+
+    def test_eleventh_post_from_one_address_gets_429(self):
+        for _ in range(10):
+            self.assertNotEqual(self.sign_in('10.0.0.1').status_code, 429)
+
+        response = self.sign_in('10.0.0.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertNotEqual(self.sign_in('10.0.0.2').status_code, 429)
+
+    def test_get_is_not_limited(self):
+        for _ in range(11):
+            self.sign_in('10.0.0.1')
+        self.assertEqual(self.client.get(reverse('accounts:sign_in'), REMOTE_ADDR='10.0.0.1').status_code, 200)
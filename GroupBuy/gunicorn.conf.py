@@ -0,0 +1,96 @@
+"""
+Gunicorn runtime profile, read automatically when gunicorn starts from this directory.
+
+Everything is tunable from the environment:
+
+    GUNICORN_WORKER_CLASS   sync | gthread | uvicorn           (default: gthread)
+    GUNICORN_WORKERS        worker processes                   (default: depends on class and CPU count)
+    GUNICORN_THREADS        threads per gthread worker         (default: 4)
+    GUNICORN_PRELOAD        1 to import the app before forking (default: 1)
+    GUNICORN_MAX_REQUESTS   recycle a worker after N requests  (default: 1000, 0 disables)
+    GUNICORN_MAX_REQUESTS_JITTER                               (default: 10% of max requests)
+    GUNICORN_TIMEOUT        seconds before a silent worker is killed (default: 30)
+    GUNICORN_KEEPALIVE      keep-alive seconds for gthread/uvicorn   (default: 5)
+    PORT                    listen port                        (default: 8000)
+    PROMETHEUS_MULTIPROC_DIR  shared metrics files (default: /dev/shm/groupbuy-metrics-$PORT)
+
+The "uvicorn" class serves GroupBuy.asgi (async read views), the others GroupBuy.wsgi.
+"""
+
+import glob
+import multiprocessing
+import os
+import tempfile
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+cpus = multiprocessing.cpu_count()
+worker_profile = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+
+if worker_profile == "uvicorn":
+    worker_class = "uvicorn_worker.UvicornWorker"
+    wsgi_app = "GroupBuy.asgi:application"
+    default_workers = cpus + 1
+elif worker_profile == "gthread":
+    worker_class = "gthread"
+    wsgi_app = "GroupBuy.wsgi:application"
+    default_workers = cpus + 1
+elif worker_profile == "sync":
+    worker_class = "sync"
+    wsgi_app = "GroupBuy.wsgi:application"
+    default_workers = 2 * cpus + 1
+else:
+    raise RuntimeError(f"Unknown GUNICORN_WORKER_CLASS {worker_profile!r}; use sync, gthread or uvicorn.")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = env_int("GUNICORN_WORKERS", default_workers)
+threads = env_int("GUNICORN_THREADS", 4) if worker_class == "gthread" else 1
+
+# Import Django once in the master so workers share its memory pages copy-on-write
+# and boot faster. Each worker still opens its own database connections (see post_fork).
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+# Recycle workers periodically to cap slow memory growth; jitter keeps them from restarting together.
+max_requests = env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = env_int("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10)
+
+timeout = env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = env_int("GUNICORN_KEEPALIVE", 5)
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+# Heartbeat files on tmpfs; a disk-backed /tmp can stall workers in containers.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# Prometheus metrics (main/metrics.py): each worker writes its values to memory-mapped
+# files here and a scrape of any worker sums them. This must be set before the app (and
+# prometheus_client) is imported. Files from the previous run are removed, so counters start at zero.
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(worker_tmp_dir if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+                 f"groupbuy-metrics-{os.environ.get('PORT', '8000')}"),
+)
+os.makedirs(metrics_dir, exist_ok=True)
+for stale in glob.glob(os.path.join(metrics_dir, "*.db")):
+    os.remove(stale)
+
+
+def post_fork(server, worker):
+    # Never share a database connection opened in the master (preload) with a worker.
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+
+    connections.close_all()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
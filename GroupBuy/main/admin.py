@@ -1,4 +1,12 @@
 from django.contrib import admin
-from .models import Contact
+from .models import Contact, ProfilingSwitch
 # Register your models here.
 admin.site.register(Contact)
+
+
+@admin.register(ProfilingSwitch)
+class ProfilingSwitchAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'threshold_ms', 'sample_rate', 'updated_at')
+
+    def has_add_permission(self, request):
+        return not ProfilingSwitch.objects.exists()
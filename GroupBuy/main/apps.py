@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        from .metrics import instrument_connection
+        connection_created.connect(instrument_connection)
+        if settings.SLOW_QUERY_MS:
+            from .slow_queries import instrument_connection as log_slow_queries
+            connection_created.connect(log_slow_queries)
+        if settings.SIMULATED_DB_LATENCY_MS:
+            from .benchmark import add_simulated_latency
+            connection_created.connect(add_simulated_latency)
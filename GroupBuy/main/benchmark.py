@@ -0,0 +1,343 @@
+"""
+Load-test helpers used by the `benchmark` management command.
+
+A benchmark run seeds a deterministic data set, replays weighted user
+journeys through the real URL names and collects latency / query numbers
+per endpoint. Results can be saved as a baseline and diffed later.
+"""
+
+import json
+import math
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from http.cookiejar import CookieJar
+from pathlib import Path
+from urllib import request as urllib_request
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from orders.models import GroupPurchase
+from products.models import Product
+
+from .datagen import DataGenerator
+
+
+BASELINE_DIR = Path(settings.BASE_DIR) / "benchmarks"
+BENCHMARK_PASSWORD = "benchmark-pass"
+BUYER_PREFIX = "bench_buyer_"
+
+
+def simulated_latency(execute, sql, params, many, context):
+    time.sleep(settings.SIMULATED_DB_LATENCY_MS / 1000)
+    return execute(sql, params, many, context)
+
+
+def add_simulated_latency(sender, connection, **kwargs):
+    """
+    connection_created receiver that delays every query by SIMULATED_DB_LATENCY_MS,
+    to benchmark servers as if the database were across a network.
+    The signal fires on every reconnect of the same wrapper, so install only once.
+    """
+    if simulated_latency not in connection.execute_wrappers:
+        connection.execute_wrappers.append(simulated_latency)
+
+
+def seed_data(seed, buyers=50, sellers=5, products=200, groups=40, orders=500, reviews=300):
+    """
+    Create a small but realistic data set for the journeys.
+    Every row is derived from `seed`, so the same seed gives the same data.
+    Returns False without writing anything if the benchmark users already exist.
+    """
+    if User.objects.filter(username__startswith=BUYER_PREFIX).exists():
+        return False
+    DataGenerator(seed=seed, prefix="bench", password=BENCHMARK_PASSWORD).run(
+        sellers=sellers, buyers=buyers, products=products, groups=groups, orders=orders, reviews=reviews,
+    )
+    return True
+
+
+class BenchmarkData:
+    """Ids of the seeded rows the journeys pick from."""
+
+    def __init__(self):
+        self.buyers = list(User.objects.filter(username__startswith=BUYER_PREFIX).values_list("username", flat=True))
+        self.products = list(Product.objects.values_list("id", flat=True))
+        self.groups = list(GroupPurchase.objects.filter(is_private=False).values_list("id", flat=True))
+        self.categories = [choice for choice, _ in Product.CategoryChoices.choices]
+
+
+class Step:
+    """A single request in a journey, addressed by URL name."""
+
+    def __init__(self, url_name, kwargs=None, method="GET", data=None, query=None):
+        self.url_name = url_name
+        self.kwargs = kwargs or {}
+        self.method = method
+        self.data = data
+        self.query = query
+
+    def url(self):
+        url = reverse(self.url_name, kwargs=self.kwargs)
+        if self.query:
+            url = f"{url}?{urlencode(self.query)}"
+        return url
+
+
+def browse_journey(rng, data):
+    """Anonymous visitor: home, catalog, search and a product page."""
+    product_id = rng.choice(data.products)
+    return None, [
+        Step("main:home_view"),
+        Step("products:all_product_view"),
+        Step("products:search_products_view", query={"search": "Product 1", "category": rng.choice(data.categories)}),
+        Step("products:product_detail_view", {"product_id": product_id}),
+    ]
+
+
+def cart_order_journey(rng, data):
+    """Buyer: product page, cart, individual order and payment page."""
+    product_id = rng.choice(data.products)
+    return rng.choice(data.buyers), [
+        Step("products:product_detail_view", {"product_id": product_id}),
+        Step("products:add_to_cart_view", {"product_id": product_id}),
+        Step("products:cart_view"),
+        Step("orders:create_order_view", {"product_id": product_id}, method="POST",
+             data={"quantity": rng.randint(1, 3), "order_type": "individual", "participants": 1}),
+        Step("orders:user_orders_view"),
+    ]
+
+
+def group_join_journey(rng, data):
+    """Buyer: group listing, group room and joining it."""
+    group_id = rng.choice(data.groups)
+    return rng.choice(data.buyers), [
+        Step("orders:group_purchase_all"),
+        Step("orders:group_purchase_detail", {"group_purchase_id": group_id}),
+        Step("orders:join_group_purchase", {"group_purchase_id": group_id}),
+    ]
+
+
+JOURNEYS = [
+    (browse_journey, 6),
+    (cart_order_journey, 3),
+    (group_join_journey, 2),
+]
+
+
+def pick_journey(rng, journeys=JOURNEYS):
+    functions = [journey for journey, _ in journeys]
+    weights = [weight for _, weight in journeys]
+    return rng.choices(functions, weights=weights)[0]
+
+
+class ClientDriver:
+    """Runs journeys in-process through the Django test client."""
+
+    counts_queries = True
+
+    def __init__(self):
+        self.clients = {}
+
+    def client_for(self, username):
+        if username not in self.clients:
+            client = Client(raise_request_exception=False)
+            if username:
+                client.force_login(User.objects.get(username=username))
+            self.clients[username] = client
+        return self.clients[username]
+
+    def request(self, username, step):
+        client = self.client_for(username)
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            if step.method == "POST":
+                response = client.post(step.url(), step.data or {})
+            else:
+                response = client.get(step.url())
+            elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, len(queries.captured_queries)
+
+
+class NoRedirect(urllib_request.HTTPRedirectHandler):
+    """Report redirects as responses so each step times a single request."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class HTTPDriver:
+    """Runs journeys over HTTP against a running server (runserver, gunicorn, uvicorn)."""
+
+    counts_queries = False
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.openers = {}
+        self.lock = threading.Lock()
+
+    def _open(self, opener, url, data=None, headers=None):
+        req = urllib_request.Request(self.base_url + url, data=data, headers=headers or {})
+        try:
+            with opener.open(req, timeout=30) as response:
+                response.read()
+                return response.status
+        except HTTPError as e:
+            return e.code
+        except (URLError, OSError):
+            # Timeouts and dropped connections count as server errors.
+            return 599
+
+    def opener_for(self, username):
+        with self.lock:
+            if username in self.openers:
+                return self.openers[username]
+            jar = CookieJar()
+            opener = urllib_request.build_opener(urllib_request.HTTPCookieProcessor(jar), NoRedirect)
+            self.openers[username] = (opener, jar)
+
+        if username:
+            self._open(opener, reverse("accounts:sign_in"))
+            body = urlencode({"username": username, "password": BENCHMARK_PASSWORD}).encode()
+            self._open(opener, reverse("accounts:sign_in"), data=body, headers=self.csrf_headers(jar))
+        return opener, jar
+
+    def csrf_headers(self, jar):
+        token = next((cookie.value for cookie in jar if cookie.name == settings.CSRF_COOKIE_NAME), "")
+        return {"X-CSRFToken": token, "Referer": self.base_url + "/"}
+
+    def request(self, username, step):
+        opener, jar = self.opener_for(username)
+        data = None
+        headers = {}
+        if step.method == "POST":
+            data = urlencode(step.data or {}).encode()
+            headers = self.csrf_headers(jar)
+        start = time.perf_counter()
+        status = self._open(opener, step.url(), data=data, headers=headers)
+        return status, time.perf_counter() - start, None
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class Recorder:
+    """Collects timings per URL name; safe to share between threads."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def add(self, url_name, status, elapsed, query_count):
+        with self.lock:
+            self.samples[url_name].append(elapsed)
+            if query_count is not None:
+                self.queries[url_name].append(query_count)
+            if status >= 500:
+                self.errors[url_name] += 1
+
+    def report(self, wall_time):
+        endpoints = {}
+        total = 0
+        for url_name, samples in sorted(self.samples.items()):
+            total += len(samples)
+            queries = self.queries.get(url_name)
+            endpoints[url_name] = {
+                "requests": len(samples),
+                "errors": self.errors[url_name],
+                "p50_ms": round(percentile(samples, 50) * 1000, 3),
+                "p95_ms": round(percentile(samples, 95) * 1000, 3),
+                "p99_ms": round(percentile(samples, 99) * 1000, 3),
+                # The endpoint's share of the run's throughput, not 1 / latency.
+                "rps": round(len(samples) / wall_time, 2) if wall_time else None,
+                "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+            }
+        return {
+            "requests": total,
+            "wall_time_s": round(wall_time, 3),
+            "rps": round(total / wall_time, 2) if wall_time else None,
+            "endpoints": endpoints,
+        }
+
+
+def run_journeys(driver, data, iterations, seed, concurrency=1, journeys=JOURNEYS):
+    """
+    Replay `iterations` weighted journeys and return the report.
+    Each worker thread draws from its own seeded random generator.
+    """
+    recorder = Recorder()
+
+    def worker(worker_id, count):
+        rng = random.Random(seed * 1000 + worker_id)
+        for _ in range(count):
+            username, steps = pick_journey(rng, journeys)(rng, data)
+            for step in steps:
+                status, elapsed, query_count = driver.request(username, step)
+                recorder.add(step.url_name, status, elapsed, query_count)
+
+    per_worker = [iterations // concurrency + (1 if i < iterations % concurrency else 0) for i in range(concurrency)]
+    start = time.perf_counter()
+    if concurrency == 1:
+        worker(0, per_worker[0])
+    else:
+        threads = [threading.Thread(target=worker, args=(i, count)) for i, count in enumerate(per_worker)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return recorder.report(time.perf_counter() - start)
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def baseline_path(name):
+    return BASELINE_DIR / f"{name}.json"
+
+
+def save_baseline(name, report):
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = baseline_path(name)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def load_baseline(name):
+    return json.loads(baseline_path(name).read_text())
+
+
+def compare_reports(baseline, report):
+    """Yield (url_name, metric, old, new, change %) rows for metrics present in both reports."""
+    for url_name, current in report["endpoints"].items():
+        previous = baseline["endpoints"].get(url_name)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "queries_per_request"):
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            change = ((new - old) / old * 100) if old else 0.0
+            yield url_name, metric, old, new, change
@@ -0,0 +1,73 @@
+"""
+Conditional GET for pages whose content follows a cheap version lookup.
+
+`conditional_page(version_func)` works like Django's `condition()` decorator:
+`version_func(request, *args, **kwargs)` runs before the view and returns
+`(parts, last_modified)`, where `parts` is anything that changes when the page
+does (typically `updated_at` values or aggregates), or None to skip. A matching
+If-None-Match / If-Modified-Since gets a 304 without running the view.
+
+The ETag also covers the user (pages show their navbar and forms) and the
+release, so a deploy invalidates old pages. Requests with flash messages waiting
+are always rendered in full so the messages are shown.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def page_validators(request, version):
+    """Return (etag, last_modified timestamp) for a version tuple, or (None, None)."""
+    if version is None or request.method not in ("GET", "HEAD") or len(get_messages(request)):
+        return None, None
+    parts, last_modified = version
+    key = repr((parts, request.user.pk, settings.RELEASE_VERSION))
+    etag = quote_etag(hashlib.md5(key.encode(), usedforsecurity=False).hexdigest())
+    if last_modified is not None:
+        last_modified = int(last_modified.timestamp())
+    return etag, last_modified
+
+
+def finish_response(request, response, etag, last_modified):
+    if etag is None or response.status_code != 200:
+        return response
+    response.headers.setdefault("ETag", etag)
+    if last_modified is not None:
+        response.headers.setdefault("Last-Modified", http_date(last_modified))
+    # Browsers keep the page but revalidate every time; personalized, so never shared.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_page(version_func):
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                version = await sync_to_async(version_func)(request, *args, **kwargs)
+                etag, last_modified = await sync_to_async(page_validators)(request, version)
+                if etag is not None:
+                    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                    if not_modified is not None:
+                        return not_modified
+                response = await view(request, *args, **kwargs)
+                return finish_response(request, response, etag, last_modified)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            etag, last_modified = page_validators(request, version_func(request, *args, **kwargs))
+            if etag is not None:
+                not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if not_modified is not None:
+                    return not_modified
+            response = view(request, *args, **kwargs)
+            return finish_response(request, response, etag, last_modified)
+        return wrapper
+    return decorator
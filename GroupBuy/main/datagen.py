@@ -0,0 +1,254 @@
+"""
+Deterministic synthetic data for load testing.
+
+`DataGenerator` builds users, products, group purchases, orders and reviews
+from a single seed. Rows are produced and written in batches so memory stays
+flat; on PostgreSQL the large tables are streamed with COPY, elsewhere with
+`bulk_create`.
+"""
+
+import csv
+import io
+import itertools
+import random
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+
+from accounts.models import Profile_User, Profile_Seller
+from orders.models import GroupPurchase, Order
+from products import popularity
+from products.models import PriceTier, Product, Review
+
+
+BRANDS = ["Dior", "Chanel", "Loreal", "Nivea", "Apple", "Samsung", "Sony", "Huda Beauty", "Gucci", "Olaplex"]
+COLOURS = ["Red", "Black", "White", "Pink", "Gold", "Silver", "Nude"]
+SIZES = ["S", "M", "L", "30ml", "50ml", "100ml", "One size"]
+REVIEW_COMMENTS = ["Great product", "Worth the price", "Not as described", "Fast delivery", "Would buy again"]
+RATING_WEIGHTS = [5, 7, 15, 33, 40]
+# Generated timestamps count back from here, so a seed always gives the same rows.
+DEFAULT_NOW = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class DataGenerator:
+    """
+    Generate a full data set from `seed`.
+
+    `popularity_skew` is the Zipf exponent used to pick products for orders,
+    reviews and groups (0 means uniform). `group_fill_rate` is the average
+    fraction of `max_participants` filled in each group purchase. `created_at`
+    values are spread over the `history_days` before `now`.
+    """
+
+    def __init__(self, seed=1, batch_size=5000, popularity_skew=1.1, group_fill_rate=0.6,
+                 prefix="gen", password=None, history_days=365, now=DEFAULT_NOW, log=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.popularity_skew = popularity_skew
+        self.group_fill_rate = group_fill_rate
+        self.prefix = prefix
+        self.password = make_password(password) if password else make_password(None)
+        self.history_days = history_days
+        self.log = log or (lambda message: None)
+        self.now = now
+        self.use_copy = connection.vendor == "postgresql"
+
+    def run(self, sellers=100, buyers=10000, products=1000, groups=500, orders=10000, reviews=5000):
+        seller_ids = self.create_users("seller", sellers, Profile_Seller)
+        buyer_ids = self.create_users("buyer", buyers, Profile_User)
+        product_rows = self.create_products(products, seller_ids)
+        self.product_weights = self.cumulative_weights(len(product_rows))
+        self.create_groups(groups, product_rows, buyer_ids)
+        self.create_orders(orders, product_rows, buyer_ids)
+        self.create_reviews(reviews, product_rows, buyer_ids)
+        # Rows were written in bulk, bypassing the live score updates.
+        popularity.rebuild(self.batch_size)
+        self.log("popularity scores")
+
+    def cumulative_weights(self, count):
+        total = 0.0
+        weights = []
+        for rank in range(1, count + 1):
+            total += 1 / rank ** self.popularity_skew
+            weights.append(total)
+        return weights
+
+    def pick_product(self, product_rows):
+        point = self.rng.random() * self.product_weights[-1]
+        return product_rows[bisect_left(self.product_weights, point)]
+
+    def random_timestamp(self):
+        return self.now - timedelta(seconds=self.rng.randint(0, self.history_days * 86400))
+
+    def write(self, model, objects):
+        """Insert `objects`; COPY on PostgreSQL, `bulk_create` elsewhere."""
+        if not self.use_copy:
+            # bulk_create stamps auto_now_add fields with the current time; write the generated ones back.
+            stamped = [field for field in model._meta.concrete_fields if getattr(field, "auto_now_add", False)]
+            generated = [[getattr(obj, field.attname) for field in stamped] for obj in objects]
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+            if stamped:
+                for obj, values in zip(objects, generated):
+                    for field, value in zip(stamped, values):
+                        setattr(obj, field.attname, value)
+                model.objects.bulk_update(objects, [field.name for field in stamped], batch_size=self.batch_size)
+            return
+        fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+        columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+        sql = f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN"
+        rows = ([getattr(obj, field.attname) for field in fields] for obj in objects)
+        with connection.cursor() as cursor:
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, "copy"):
+                # psycopg 3
+                with raw_cursor.copy(sql) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+            else:
+                # psycopg2
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in rows:
+                    writer.writerow(["" if value is None else value for value in row])
+                buffer.seek(0)
+                raw_cursor.copy_expert(f"{sql} WITH (FORMAT csv)", buffer)
+
+    def create_users(self, role, count, profile_model):
+        """Users are created with `bulk_create` since their ids are needed afterwards."""
+        ids = []
+        for batch in batched(range(count), self.batch_size):
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(username=f"{self.prefix}_{role}_{i}", email=f"{self.prefix}_{role}_{i}@example.com",
+                         first_name=role.title(), last_name=str(i), password=self.password)
+                    for i in batch
+                ])
+                if profile_model is Profile_Seller:
+                    profiles = [Profile_Seller(user=user, CR=f"CR{user.id:08d}", CR_image="images/cr/images2.png") for user in users]
+                else:
+                    profiles = [Profile_User(user=user, city=self.rng.choice(["Riyadh", "Jeddah", "Dammam"])) for user in users]
+                self.write(profile_model, profiles)
+            ids.extend(user.id for user in users)
+        self.log(f"{count} {role}s")
+        return ids
+
+    def create_products(self, count, seller_ids):
+        """Returns (id, price, group_price, max_participants) tuples in popularity order."""
+        categories = [choice for choice, _ in Product.CategoryChoices.choices]
+        rows = []
+        for batch in batched(range(count), self.batch_size):
+            new_products = []
+            for i in batch:
+                price = Decimal(self.rng.randint(1500, 150000)) / 100
+                has_group_price = self.rng.random() < 0.7
+                min_participants = self.rng.randint(2, 4)
+                new_products.append(Product(
+                    seller_id=self.rng.choice(seller_ids),
+                    name=f"{self.rng.choice(BRANDS)} {self.rng.choice(categories)} {i}",
+                    price=price,
+                    group_price=(price * Decimal(self.rng.randint(60, 90)) / 100).quantize(Decimal("0.01")) if has_group_price else None,
+                    min_participants=min_participants,
+                    max_participants=min_participants + self.rng.randint(1, 8),
+                    description=f"Synthetic product {i}",
+                    category=self.rng.choice(categories),
+                    brand=self.rng.choice(BRANDS),
+                    colour=self.rng.choice(COLOURS),
+                    size=self.rng.choice(SIZES),
+                    quantity=self.rng.randint(0, 1000),
+                ))
+            with transaction.atomic():
+                Product.objects.bulk_create(new_products)
+                self.write(PriceTier, [
+                    PriceTier(product_id=product.id, min_participants=threshold,
+                              price=(product.group_price * discount).quantize(Decimal("0.01")))
+                    for product in new_products
+                    if product.group_price and self.rng.random() < 0.5
+                    for threshold, discount in self.tier_steps(product)
+                ])
+            rows.extend((p.id, p.price, p.group_price, p.max_participants) for p in new_products)
+        self.log(f"{count} products")
+        return rows
+
+    def tier_steps(self, product):
+        """Two cheaper tiers: one just above the minimum group size and one at the maximum."""
+        steps = [(product.min_participants + 1, Decimal("0.95"))]
+        if product.max_participants > product.min_participants + 1:
+            steps.append((product.max_participants, Decimal("0.9")))
+        return steps
+
+    def create_groups(self, count, product_rows, buyer_ids):
+        """Groups are filled with participants and the matching group orders."""
+        group_products = [row for row in product_rows if row[2] is not None]
+        if not group_products:
+            return
+        group_weights, self.product_weights = self.product_weights, self.cumulative_weights(len(group_products))
+        through = GroupPurchase.participants.through
+        for batch in batched(range(count), self.batch_size):
+            groups = []
+            members = []
+            for _ in batch:
+                product_id, price, group_price, max_participants = self.pick_product(group_products)
+                filled = sum(self.rng.random() < self.group_fill_rate for _ in range(max_participants))
+                participants = self.rng.sample(buyer_ids, min(filled, len(buyer_ids)))
+                groups.append(GroupPurchase(
+                    product_id=product_id,
+                    is_active=len(participants) < max_participants,
+                    is_private=self.rng.random() < 0.1,
+                    total_price=group_price * len(participants),
+                ))
+                members.append((participants, product_id, group_price))
+            with transaction.atomic():
+                GroupPurchase.objects.bulk_create(groups)
+                self.write(through, [
+                    through(grouppurchase_id=group.id, user_id=user_id)
+                    for group, (participants, _, _) in zip(groups, members)
+                    for user_id in participants
+                ])
+                self.write(Order, [
+                    Order(user_id=user_id, product_id=product_id, group_purchase_id=group.id, quantity=1,
+                          unit_price=group_price, total_price=group_price, order_type=Order.OrderType.GROUP,
+                          participants=len(participants), created_at=self.random_timestamp())
+                    for group, (participants, product_id, group_price) in zip(groups, members)
+                    for user_id in participants
+                ])
+        self.product_weights = group_weights
+        self.log(f"{count} group purchases")
+
+    def create_orders(self, count, product_rows, buyer_ids):
+        for batch in batched(range(count), self.batch_size):
+            orders = []
+            for _ in batch:
+                product_id, price, _, _ = self.pick_product(product_rows)
+                quantity = self.rng.choices([1, 2, 3, 4], weights=[70, 20, 7, 3])[0]
+                orders.append(Order(
+                    user_id=self.rng.choice(buyer_ids), product_id=product_id, quantity=quantity,
+                    unit_price=price, total_price=price * quantity, order_type=Order.OrderType.INDIVIDUAL,
+                    participants=1, created_at=self.random_timestamp(),
+                ))
+            with transaction.atomic():
+                self.write(Order, orders)
+        self.log(f"{count} individual orders")
+
+    def create_reviews(self, count, product_rows, buyer_ids):
+        for batch in batched(range(count), self.batch_size):
+            reviews = [
+                Review(
+                    product_id=self.pick_product(product_rows)[0], user_id=self.rng.choice(buyer_ids),
+                    rating=self.rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0],
+                    comment=self.rng.choice(REVIEW_COMMENTS), created_at=self.random_timestamp(),
+                )
+                for _ in batch
+            ]
+            with transaction.atomic():
+                self.write(Review, reviews)
+        self.log(f"{count} reviews")
@@ -0,0 +1,128 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from main import benchmark
+from products import view_counter
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay weighted storefront journeys (browse, cart/order, group join) and report "
+        "p50/p95/p99 latency, requests/sec and queries/request per URL name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200, help="Number of journeys to replay.")
+        parser.add_argument("--random-seed", type=int, default=1, help="Seed for data generation and journey choice.")
+        parser.add_argument("--products", type=int, default=200)
+        parser.add_argument("--buyers", type=int, default=50)
+        parser.add_argument("--groups", type=int, default=40)
+        parser.add_argument("--orders", type=int, default=500)
+        parser.add_argument("--reviews", type=int, default=300)
+        parser.add_argument("--warmup", type=int, default=10, help="Journeys replayed before measuring.")
+        parser.add_argument(
+            "--base-url",
+            help="Drive a running server over HTTP instead of the in-process test client. "
+                 "The configured database is only seeded with --seed. Start the server "
+                 "with RATE_LIMIT_ENABLED=0, or every journey shares one client's rate limits.",
+        )
+        parser.add_argument(
+            "--journey", action="append", choices=[journey.__name__ for journey, _ in benchmark.JOURNEYS],
+            help="Only replay these journeys (repeatable), e.g. browse_journey for a read-only run.",
+        )
+        parser.add_argument("--concurrency", type=int, default=1, help="Worker threads (HTTP driver only).")
+        parser.add_argument(
+            "--seed", action="store_true",
+            help="With --base-url, create the bench_* rows in the configured database first. "
+                 "Skipped if they already exist.",
+        )
+        parser.add_argument("--save-baseline", metavar="NAME", help="Store the report under benchmarks/NAME.json.")
+        parser.add_argument("--compare", metavar="NAME", help="Diff the report against benchmarks/NAME.json.")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] > 1 and not options["base_url"]:
+            raise CommandError("--concurrency needs --base-url; the test client runs in a single thread.")
+        if options["compare"] and not benchmark.baseline_path(options["compare"]).exists():
+            raise CommandError(f"No baseline named '{options['compare']}'.")
+
+        journeys = benchmark.JOURNEYS
+        if options["journey"]:
+            journeys = [(journey, weight) for journey, weight in journeys if journey.__name__ in options["journey"]]
+        options["journeys"] = journeys
+
+        if options["base_url"]:
+            report = self.run_http(options)
+        else:
+            report = self.run_client(options)
+
+        report["commit"] = benchmark.current_commit()
+        report["driver"] = "http" if options["base_url"] else "client"
+        report["iterations"] = options["iterations"]
+        report["seed"] = options["random_seed"]
+        report["journeys"] = [journey.__name__ for journey, _ in options["journeys"]]
+
+        self.print_report(report)
+
+        if options["compare"]:
+            self.print_comparison(benchmark.load_baseline(options["compare"]), report)
+        if options["save_baseline"]:
+            path = benchmark.save_baseline(options["save_baseline"], report)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {path}"))
+
+    def seed(self, options):
+        return benchmark.seed_data(
+            options["random_seed"],
+            buyers=options["buyers"],
+            products=options["products"],
+            groups=options["groups"],
+            orders=options["orders"],
+            reviews=options["reviews"],
+        )
+
+    def run_client(self, options):
+        # Run against a throwaway test database so the numbers don't depend on local data.
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.seed(options)
+            data = benchmark.BenchmarkData()
+            driver = benchmark.ClientDriver()
+            # Every simulated buyer comes from the same address; don't let the rate limits throttle them.
+            with override_settings(RATE_LIMIT_ENABLED=False):
+                benchmark.run_journeys(driver, data, options["warmup"], options["random_seed"] + 1, journeys=options["journeys"])
+                return benchmark.run_journeys(driver, data, options["iterations"], options["random_seed"], journeys=options["journeys"])
+        finally:
+            # Write buffered product views while the test database still exists.
+            view_counter.buffer.flush()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run_http(self, options):
+        if options["seed"] and not self.seed(options):
+            self.stdout.write("Benchmark users already exist; reusing the seeded rows.")
+        data = benchmark.BenchmarkData()
+        if not data.buyers:
+            raise CommandError("No benchmark users found; run once with --seed first.")
+        driver = benchmark.HTTPDriver(options["base_url"])
+        benchmark.run_journeys(driver, data, options["warmup"], options["random_seed"] + 1, options["concurrency"], options["journeys"])
+        return benchmark.run_journeys(driver, data, options["iterations"], options["random_seed"], options["concurrency"], options["journeys"])
+
+    def print_report(self, report):
+        header = f"{'endpoint':45} {'reqs':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rps':>8} {'q/req':>6}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for url_name, row in report["endpoints"].items():
+            queries = "-" if row["queries_per_request"] is None else row["queries_per_request"]
+            self.stdout.write(
+                f"{url_name:45} {row['requests']:>6} {row['errors']:>4} {row['p50_ms']:>9} "
+                f"{row['p95_ms']:>9} {row['p99_ms']:>9} {row['rps']:>8} {queries:>6}"
+            )
+        self.stdout.write(f"\n{report['requests']} requests in {report['wall_time_s']}s ({report['rps']} req/s)")
+
+    def print_comparison(self, baseline, report):
+        self.stdout.write(f"\nCompared with baseline from commit {baseline.get('commit') or 'unknown'}:")
+        for url_name, metric, old, new, change in benchmark.compare_reports(baseline, report):
+            style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+            self.stdout.write(style(f"  {url_name:45} {metric:20} {old:>9} -> {new:>9} ({change:+.1f}%)"))
@@ -0,0 +1,69 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from main.datagen import DEFAULT_NOW, DataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic data set (users, products, group purchases, orders, reviews) "
+        "for load testing. Uses bulk_create in batches, and COPY on PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--sellers", type=int, default=100)
+        parser.add_argument("--buyers", type=int, default=10000)
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument("--groups", type=int, default=500)
+        parser.add_argument("--orders", type=int, default=10000, help="Individual orders; group orders follow from --groups.")
+        parser.add_argument("--reviews", type=int, default=5000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--popularity-skew", type=float, default=1.1,
+                            help="Zipf exponent for product popularity; 0 picks products uniformly.")
+        parser.add_argument("--group-fill-rate", type=float, default=0.6,
+                            help="Average fraction of max_participants filled per group purchase (0-1).")
+        parser.add_argument("--history-days", type=int, default=365, help="Spread created_at over this many days.")
+        parser.add_argument("--now", type=datetime.fromisoformat, default=DEFAULT_NOW,
+                            help=f"ISO date the history ends at (default {DEFAULT_NOW.date()}), fixed so a seed is repeatable.")
+        parser.add_argument("--prefix", default="gen", help="Username prefix; must be unused in the database.")
+        parser.add_argument("--password", help="Password for every generated user (unusable if omitted).")
+
+    def handle(self, *args, **options):
+        if not 0 <= options["group_fill_rate"] <= 1:
+            raise CommandError("--group-fill-rate must be between 0 and 1.")
+        if options["sellers"] < 1 or options["buyers"] < 1:
+            raise CommandError("At least one seller and one buyer are needed.")
+
+        now = options["now"]
+        if timezone.is_naive(now):
+            now = timezone.make_aware(now)
+
+        start = time.perf_counter()
+
+        def log(message):
+            self.stdout.write(f"[{time.perf_counter() - start:8.1f}s] {message}")
+
+        generator = DataGenerator(
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            popularity_skew=options["popularity_skew"],
+            group_fill_rate=options["group_fill_rate"],
+            prefix=options["prefix"],
+            password=options["password"],
+            history_days=options["history_days"],
+            now=now,
+            log=log,
+        )
+        generator.run(
+            sellers=options["sellers"],
+            buyers=options["buyers"],
+            products=options["products"],
+            groups=options["groups"],
+            orders=options["orders"],
+            reviews=options["reviews"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - start:.1f}s"))
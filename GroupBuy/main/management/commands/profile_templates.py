@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from main.template_profiler import profile_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Request pages with the test client against the configured database and report "
+        "per-template render time (inclusive and self) and render/include counts per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="URL paths to render, e.g. / /products/all/")
+        parser.add_argument("--repeat", type=int, default=20, help="Requests per path (after one warm-up request).")
+        parser.add_argument("--user", help="Username to log in as before requesting.")
+
+    def handle(self, *args, **options):
+        # Anonymous pages would otherwise come from the page cache after the warm-up, rendering nothing.
+        with override_settings(PAGE_CACHE_TIMEOUT=0):
+            self.profile(options)
+
+    def profile(self, options):
+        client = Client()
+        if options["user"]:
+            try:
+                client.force_login(User.objects.get(username=options["user"]))
+            except User.DoesNotExist:
+                raise CommandError(f"No user named '{options['user']}'.")
+
+        repeat = options["repeat"]
+        for path in options["paths"]:
+            response = client.get(path)
+            if response.status_code != 200:
+                raise CommandError(f"{path} returned {response.status_code}.")
+
+            start = time.perf_counter()
+            with profile_templates() as stats:
+                for _ in range(repeat):
+                    client.get(path)
+            elapsed = (time.perf_counter() - start) / repeat
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{path}  ({elapsed * 1000:.1f} ms per request)"))
+            self.stdout.write(f"{'template':50} {'renders':>8} {'incl ms':>9} {'self ms':>9}")
+            for name, renders, total, own in stats.rows():
+                self.stdout.write(
+                    f"{name:50} {renders / repeat:>8.1f} {total / repeat * 1000:>9.2f} {own / repeat * 1000:>9.2f}"
+                )
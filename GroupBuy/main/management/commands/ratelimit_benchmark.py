@@ -0,0 +1,50 @@
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.urls import resolve
+
+from main.ratelimit import RateLimitMiddleware
+
+
+class Command(BaseCommand):
+    help = (
+        "Time RateLimitMiddleware against the configured cache for requests that are let through "
+        "and requests that are throttled, and print the median and p99 per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000, help="Requests timed per case.")
+        parser.add_argument("--path", default="/orders/create-order/1/", help="Rate-limited URL to POST to.")
+
+    def handle(self, *args, **options):
+        match = resolve(options["path"])
+        middleware = RateLimitMiddleware(lambda request: None)
+        factory = RequestFactory()
+
+        def request(address):
+            request = factory.post(options["path"], REMOTE_ADDR=address)
+            request.resolver_match = match
+            request.user = AnonymousUser()
+            return request
+
+        n = options["requests"]
+        # A fresh client per request (always allowed), then one client far over its limit.
+        cases = {
+            "allowed": [request(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}") for i in range(n)],
+            "throttled": [request("192.0.2.1") for _ in range(n)],
+        }
+        self.stdout.write(f"cache: {type(caches['default']).__name__}, view: {match.view_name}")
+        self.stdout.write(f"{'case':12} {'median µs':>10} {'p99 µs':>10} {'429s':>6}")
+        for name, requests in cases.items():
+            timings, throttled = [], 0
+            for req in requests:
+                start = time.perf_counter()
+                response = middleware.process_view(req, match.func, match.args, match.kwargs)
+                timings.append((time.perf_counter() - start) * 1e6)
+                throttled += response is not None
+            p99 = statistics.quantiles(timings, n=100)[98]
+            self.stdout.write(f"{name:12} {statistics.median(timings):>10.1f} {p99:>10.1f} {throttled:>6}")
@@ -0,0 +1,65 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from main.slow_queries import read_log
+
+SORT_KEYS = {
+    "total": lambda group: group["total_ms"],
+    "count": lambda group: group["count"],
+    "max": lambda group: group["max_ms"],
+    "mean": lambda group: group["total_ms"] / group["count"],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregate the slow query log (SLOW_QUERY_LOG) by query fingerprint and print the top N "
+        "with their time, the views and code that ran them, and their latest EXPLAIN plan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=10, help="Fingerprints to show.")
+        parser.add_argument("--sort", choices=SORT_KEYS, default="total", help="Rank by total, count, max or mean time.")
+        parser.add_argument("--hours", type=float, help="Only count queries logged in the last N hours.")
+        parser.add_argument("--log", default=settings.SLOW_QUERY_LOG, help="Log file to read (its .1 rotation is read too).")
+        parser.add_argument("--no-plans", action="store_true", help="Leave out the EXPLAIN plans.")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options["hours"]) if options["hours"] else None
+        groups = {}
+        for entry in read_log(options["log"]):
+            if since and parse_datetime(entry["time"]) < since:
+                continue
+            group = groups.setdefault(entry["fingerprint"], {
+                "sql": entry["sql"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "views": Counter(), "origins": Counter(), "plan": None,
+            })
+            group["count"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+            group["views"][entry["view"]] += 1
+            group["origins"][entry["origin"] or "unknown"] += 1
+            if entry.get("plan"):
+                group["plan"] = entry["plan"]
+
+        if not groups:
+            self.stdout.write(f"No slow queries logged in {options['log']}.")
+            return
+
+        ranked = sorted(groups.items(), key=lambda item: SORT_KEYS[options["sort"]](item[1]), reverse=True)
+        self.stdout.write(f"{len(groups)} fingerprints, {sum(g['count'] for g in groups.values())} slow queries.")
+        for rank, (key, group) in enumerate(ranked[:options["top"]], 1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"\n#{rank} {key}: {group['count']} queries, {group['total_ms']:.0f} ms total, "
+                f"{group['total_ms'] / group['count']:.0f} ms mean, {group['max_ms']:.0f} ms max"
+            ))
+            self.stdout.write(group["sql"][:1000])
+            self.stdout.write("views:   " + ", ".join(f"{view} ({n})" for view, n in group["views"].most_common(3)))
+            self.stdout.write("origins: " + ", ".join(f"{origin} ({n})" for origin, n in group["origins"].most_common(3)))
+            if group["plan"] and not options["no_plans"]:
+                self.stdout.write("plan:\n  " + group["plan"].replace("\n", "\n  "))
@@ -0,0 +1,73 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# Runs in a fresh interpreter so every phase is measured cold, as on a container boot.
+BOOT_SCRIPT = """
+import json, os, time
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "GroupBuy.settings")
+timings = {}
+def phase(name, start):
+    timings[name] = (time.perf_counter() - start) * 1000
+    return time.perf_counter()
+
+start = time.perf_counter()
+import django
+django.setup()
+start = phase("django.setup (settings, apps, models)", start)
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+executor = MigrationExecutor(connection)
+start = phase("load migration graph", start)
+plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+start = phase("migration plan (migrate with nothing to apply)", start)
+
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+application = get_wsgi_application()
+get_resolver().url_patterns
+start = phase("WSGI handler, middleware and URLconf", start)
+
+if "--static" in os.environ.get("STARTUP_REPORT_FLAGS", ""):
+    from django.contrib.staticfiles.finders import get_finders
+    files = sum(1 for finder in get_finders() for _ in finder.list([]))
+    start = phase("scan static sources (per-boot collectstatic)", start)
+
+print(json.dumps({"timings": timings, "unapplied": len(plan), "migrations": len(executor.loader.graph.nodes)}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the phases of a cold application boot (Django setup, migration graph and plan, "
+        "WSGI/URLconf) in fresh interpreters and print the median of each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start.")
+        parser.add_argument("--static", action="store_true",
+                            help="Also time the static file scan that a per-boot collectstatic does.")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, STARTUP_REPORT_FLAGS="--static" if options["static"] else "")
+        runs = []
+        for _ in range(options["runs"]):
+            result = subprocess.run([sys.executable, "-c", BOOT_SCRIPT], cwd=settings.BASE_DIR, env=env,
+                                    capture_output=True, text=True, check=True)
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        self.stdout.write(f"{'phase':50} {'median ms':>10} {'max ms':>10}")
+        total = 0
+        for name in runs[0]["timings"]:
+            values = [run["timings"][name] for run in runs]
+            total += statistics.median(values)
+            self.stdout.write(f"{name:50} {statistics.median(values):>10.1f} {max(values):>10.1f}")
+        self.stdout.write(f"{'total':50} {total:>10.1f}")
+        self.stdout.write(f"\n{runs[0]['migrations']} migrations in the graph, {runs[0]['unapplied']} unapplied.")
@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired database sessions in small batches. Unlike clearsessions, which removes "
+        "them all in one DELETE, each batch is its own short transaction, so a large backlog never "
+        "holds locks on django_session for long."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Sessions deleted per statement.")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between batches.")
+
+    def handle(self, *args, **options):
+        if settings.SESSION_MODE == "signed_cookies":
+            self.stdout.write("Sessions are stored in cookies; there is nothing to sweep.")
+            return
+
+        # Sessions that expire while the sweep runs are left for the next one.
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now).order_by("expire_date")
+        deleted = 0
+        while True:
+            keys = list(expired.values_list("session_key", flat=True)[:options["batch_size"]])
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys, expire_date__lt=now).delete()[0]
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+        self.stdout.write(f"Deleted {deleted} expired sessions.")
@@ -0,0 +1,145 @@
+"""
+Prometheus metrics.
+
+The metrics below are module-level prometheus_client objects that views and
+hooks update in process. `/metrics` (main.views.metrics_view) renders them in
+the text exposition format, together with gauges read at scrape time: the
+background queue depths (from the database) and the product view buffer's
+pending views and flush lag (products/view_counter.py).
+
+A scrape reaches just one gunicorn worker. gunicorn.conf.py therefore sets
+PROMETHEUS_MULTIPROC_DIR (in /dev/shm when available) before the app is
+imported. Each worker then keeps its values in memory-mapped files there, and
+any worker can answer a scrape with the sum over all workers, including
+exited ones. Without the variable (runserver, tests), the metrics are per
+process.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from django.utils.deprecation import MiddlewareMixin
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, disable_created_metrics,
+    generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# Single-process scrapes would otherwise add a *_created timestamp series per counter.
+disable_created_metrics()
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+REQUEST_LATENCY = Histogram(
+    "groupbuy_request_duration_seconds", "Time to produce a response, by URL name.", ["view", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPONSES = Counter("groupbuy_responses", "Responses by URL name and status code.", ["view", "method", "status"])
+DB_QUERIES = Counter("groupbuy_db_queries", "Database queries executed.", ["alias"])
+DB_QUERY_SECONDS = Counter("groupbuy_db_query_seconds", "Time spent executing database queries.", ["alias"])
+CACHE_LOOKUPS = Counter("groupbuy_cache_lookups", "Cache lookups by cache and result (hit or miss).", ["cache", "result"])
+GROUP_JOINS = Counter("groupbuy_group_joins", "Buyers who joined a group purchase.")
+GROUP_COMPLETIONS = Counter("groupbuy_group_completions", "Group purchases closed because they filled up or sold out.")
+ORDERS_CREATED = Counter("groupbuy_orders_created", "Orders created, by order type.", ["order_type"])
+EMAILS = Counter("groupbuy_emails", "Emails sent, by kind and result (sent or failed).", ["kind", "result"])
+
+
+def cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+@contextmanager
+def counting_email(kind):
+    """Count the email sent inside the block as sent, or as failed if the block raises."""
+    try:
+        yield
+    except Exception:
+        EMAILS.labels(kind, "failed").inc()
+        raise
+    EMAILS.labels(kind, "sent").inc()
+
+
+def timed_query(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        alias = context["connection"].alias
+        DB_QUERIES.labels(alias).inc()
+        DB_QUERY_SECONDS.labels(alias).inc(time.perf_counter() - start)
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """connection_created receiver that counts and times every query. The signal fires on every reconnect."""
+    if timed_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(timed_query)
+
+
+class QueueCollector:
+    """Jobs waiting in the background queues, counted at scrape time so every worker reports the same value."""
+
+    def describe(self):
+        return [GaugeMetricFamily("groupbuy_queue_depth", "Jobs waiting in a background queue.", labels=["queue"])]
+
+    def collect(self):
+        from orders.models import PaymentTest
+        from products.models import ProductImport
+
+        depth = self.describe()[0]
+        depth.add_metric(["payments"], PaymentTest.objects.filter(status=PaymentTest.Status.QUEUED).count())
+        depth.add_metric(["product_imports"], ProductImport.objects.filter(status=ProductImport.Status.QUEUED).count())
+        yield depth
+
+
+class ViewBufferCollector:
+    """
+    The product view buffer of the process answering the scrape. Each worker
+    buffers its own views, so these describe one worker, sampled at random.
+    """
+
+    def describe(self):
+        return [
+            GaugeMetricFamily("groupbuy_view_counter_pending_views", "Product views counted but not yet written."),
+            GaugeMetricFamily("groupbuy_view_counter_flush_lag_seconds", "Age of the oldest unwritten product view."),
+        ]
+
+    def collect(self):
+        from products import view_counter
+
+        stats = view_counter.stats()
+        pending, lag = self.describe()
+        pending.add_metric([], stats["pending_views"])
+        lag.add_metric([], stats["flush_lag_seconds"])
+        yield pending
+        yield lag
+
+
+SCRAPE_TIME = CollectorRegistry()
+SCRAPE_TIME.register(QueueCollector())
+SCRAPE_TIME.register(ViewBufferCollector())
+
+
+def render():
+    """The exposition text for a scrape: every worker's metrics when multiprocess, then the scrape-time gauges."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry) + generate_latest(SCRAPE_TIME)
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    def process_request(self, request):
+        request._metrics_start = time.perf_counter()
+
+    def process_response(self, request, response):
+        start = getattr(request, "_metrics_start", None)
+        if start is not None:
+            view = request.resolver_match.view_name if request.resolver_match else "unresolved"
+            method = request.method if request.method in METHODS else "other"
+            REQUEST_LATENCY.labels(view, method).observe(time.perf_counter() - start)
+            RESPONSES.labels(view, method, str(response.status_code)).inc()
+        return response
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:12
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfilingSwitch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("enabled", models.BooleanField(default=False)),
+                (
+                    "threshold_ms",
+                    models.PositiveIntegerField(
+                        default=1000,
+                        help_text="Save a profile of every request slower than this.",
+                    ),
+                ),
+                (
+                    "sample_rate",
+                    models.FloatField(
+                        default=0.0,
+                        help_text="Also save a profile of this fraction of all requests (0 to 1).",
+                        validators=[
+                            django.core.validators.MinValueValidator(0.0),
+                            django.core.validators.MaxValueValidator(1.0),
+                        ],
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 # Create your models here.
@@ -11,4 +12,23 @@ class Contact(models.Model):
 
 
     def __str__(self) -> str:
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+class ProfilingSwitch(models.Model):
+    """Runtime settings for the slow request profiler (main/request_profiler.py). There is only one row."""
+
+    enabled = models.BooleanField(default=False)
+    threshold_ms = models.PositiveIntegerField(default=1000, help_text="Save a profile of every request slower than this.")
+    sample_rate = models.FloatField(
+        default=0.0, validators=[MinValueValidator(0.0), MaxValueValidator(1.0)],
+        help_text="Also save a profile of this fraction of all requests (0 to 1).",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        self.pk = 1
+        super().save(*args, **kwargs)
+
+    def __str__(self) -> str:
+        return f"Profiling {'on' if self.enabled else 'off'}"
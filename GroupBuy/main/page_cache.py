@@ -0,0 +1,131 @@
+"""
+Full-page cache for anonymous visitors.
+
+`anonymous_page_cache("catalog", "product:{product_id}")` caches a view's
+rendered page for anonymous GET requests. The group names (formatted with the
+view's URL kwargs) pick generation stamps held in the cache. `invalidate()`
+replaces a stamp, so every page cached under it is missed from then on, in
+every process sharing the cache. `generation()` exposes a group's stamp, so
+conditional GET can version the catalog without querying the product table.
+
+Holes: per-visitor CSRF tokens are swapped for a placeholder before caching
+and refilled with the visitor's own token when served. Signed-in users and
+requests with flash messages waiting always get a fresh render, so the navbar
+and messages are never shared.
+"""
+
+import hashlib
+import re
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+
+from .metrics import cache_lookup
+
+CATALOG = "catalog"
+CSRF_PLACEHOLDER = "__page_cache_csrf_token__"
+CSRF_VALUE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+
+def product_group(product_id):
+    return f"product:{product_id}"
+
+
+def invalidate(*groups):
+    """Retire every cached page in these groups."""
+    stamp = time.time_ns()
+    cache.set_many({f"page-gen:{group}": stamp for group in groups}, None)
+
+
+def generations(groups):
+    keys = [f"page-gen:{group}" for group in groups]
+    stamps = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in stamps}
+    if missing:
+        for key, stamp in missing.items():
+            cache.add(key, stamp, None)
+        stamps.update(cache.get_many(list(missing)))
+    return [stamps.get(key) for key in keys]
+
+
+def generation(group):
+    """The group's current stamp (nanoseconds since the epoch), replaced by every `invalidate()`."""
+    return generations([group])[0]
+
+
+def is_shared():
+    """False for the per-process local memory cache, which never sees other processes' invalidations."""
+    return not isinstance(caches["default"], LocMemCache)
+
+
+def is_cacheable(request):
+    return (
+        settings.PAGE_CACHE_TIMEOUT > 0
+        and request.method in ("GET", "HEAD")
+        and not request.user.is_authenticated
+        and not len(get_messages(request))
+    )
+
+
+def lookup(request, groups):
+    """Return (cache key, response) for a cached page, (cache key, None) on a miss, or (None, None) if not cacheable."""
+    if not is_cacheable(request):
+        return None, None
+    raw = repr((request.get_full_path(), generations(groups), settings.RELEASE_VERSION))
+    key = "page:" + hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+    cached = cache.get(key)
+    cache_lookup("page", cached is not None)
+    if cached is None:
+        return key, None
+
+    headers = cached["headers"]
+    not_modified = get_conditional_response(request, etag=headers.get("ETag"))
+    if not_modified is not None:
+        return key, not_modified
+    content = cached["content"]
+    if CSRF_PLACEHOLDER in content:
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+    response = HttpResponse(content, headers=headers)
+    response["X-Page-Cache"] = "hit"
+    return key, response
+
+
+def store(key, response):
+    if key is None or response.status_code != 200 or response.streaming or response.cookies:
+        return response
+    content = CSRF_VALUE.sub(rf"\g<1>{CSRF_PLACEHOLDER}\g<2>", response.content.decode(response.charset))
+    headers = {name: response[name] for name in STORED_HEADERS if name in response}
+    cache.set(key, {"content": content, "headers": headers}, settings.PAGE_CACHE_TIMEOUT)
+    response["X-Page-Cache"] = "miss"
+    return response
+
+
+def anonymous_page_cache(*groups):
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                key, cached = await sync_to_async(lookup)(request, [group.format(**kwargs) for group in groups])
+                if cached is not None:
+                    return cached
+                response = await view(request, *args, **kwargs)
+                return await sync_to_async(store)(key, response)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key, cached = lookup(request, [group.format(**kwargs) for group in groups])
+            if cached is not None:
+                return cached
+            return store(key, view(request, *args, **kwargs))
+        return wrapper
+    return decorator
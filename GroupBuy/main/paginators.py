@@ -0,0 +1,35 @@
+"""
+Admin changelist paginator for large tables.
+
+Counting every row of an unfiltered table is a full scan on PostgreSQL.
+`EstimatedCountPaginator` reads the planner's row estimate (pg_class.reltuples,
+kept current by autovacuum/ANALYZE) instead, once the estimate passes
+ADMIN_ESTIMATED_COUNT_THRESHOLD. Filtered or searched changelists, small
+tables and other databases still get an exact count.
+"""
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset):
+    """The planner's row estimate for an unfiltered queryset's table, or None."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql" or queryset.query.where or queryset.query.distinct:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    # reltuples is -1 for a table that has never been analyzed.
+    return int(row[0]) if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        return super().count
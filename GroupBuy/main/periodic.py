@@ -0,0 +1,47 @@
+"""
+Periodic background tasks for the web process.
+
+`PeriodicTask(name, func, interval)` calls `func` every `interval` seconds on
+a daemon thread. `ensure_started()` starts the thread in the current process
+(again after a fork, where threads do not survive), so it can be called on
+every request: after the first call it is a pid comparison. Each run uses and
+releases its own DB connection, and an exception is logged without stopping
+the thread.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval  # seconds, or a callable returning them so settings overrides apply
+        self.lock = threading.Lock()
+        self.pid = None
+
+    def ensure_started(self):
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                threading.Thread(target=self.run, name=self.name, daemon=True).start()
+
+    def run(self):
+        while True:
+            time.sleep(self.interval() if callable(self.interval) else self.interval)
+            close_old_connections()
+            try:
+                self.func()
+            except Exception:
+                logger.exception("Periodic task %s failed.", self.name)
+            finally:
+                close_old_connections()
@@ -0,0 +1,150 @@
+"""
+Token-bucket rate limiting for endpoints bots like to hammer.
+
+RATE_LIMITS maps URL names to bucket rates per scope, plus optionally the HTTP
+methods that count (all of them when omitted):
+
+    "orders:create_order_view": {"user": "20/m", "ip": "60/m", "methods": ["POST"]}
+
+A "20/m" bucket holds up to 20 tokens and refills at 20 per minute. Each request
+takes one token from each of its buckets; when one is empty, `RateLimitMiddleware`
+answers 429 with Retry-After before the view (and its password hashing or
+transaction) runs. "ip" buckets are per client address. "user" buckets are per
+signed-in user and fall back to the address for anonymous requests.
+
+Buckets live in the default cache. With Redis, a Lua script refills and takes a
+token in one atomic step using the Redis clock, so every worker and host shares
+the same buckets. Other backends update the bucket under a per-process lock.
+That is exact for the per-process LocMemCache, but only approximate for caches
+shared through another backend. If the cache is unreachable, requests are let
+through rather than locked out.
+"""
+
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "m": 60, "h": 3600}
+
+# KEYS[1]: bucket; ARGV: capacity, refill per second. Returns {allowed, retry-after ms}.
+TAKE_TOKEN = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(bucket[1]) or capacity
+local stamp = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - stamp) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'stamp', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, retry}
+"""
+
+_lock = threading.Lock()
+_scripts = {}
+
+
+def parse_rate(rate):
+    """'20/m' -> (capacity 20, refill 20/60 tokens per second)."""
+    count, period = rate.split("/")
+    return int(count), int(count) / PERIODS[period]
+
+
+def client_ip(request):
+    """
+    The client address. Behind RATE_LIMIT_PROXY_COUNT trusted proxies that append to
+    X-Forwarded-For, it is the entry the outermost proxy added; earlier entries are client-supplied.
+    """
+    proxies = settings.RATE_LIMIT_PROXY_COUNT
+    forwarded = [ip.strip() for ip in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if ip.strip()]
+    if proxies and len(forwarded) >= proxies:
+        return forwarded[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def redis_take(cache, key, capacity, rate):
+    client = cache._cache.get_client(key, write=True)
+    script = _scripts.get(id(client))
+    if script is None:
+        script = _scripts[id(client)] = client.register_script(TAKE_TOKEN)
+    allowed, retry_ms = script(keys=[key], args=[capacity, rate])
+    return bool(allowed), retry_ms / 1000
+
+
+def local_take(cache, key, capacity, rate):
+    now = time.time()
+    with _lock:
+        tokens, stamp = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + max(0.0, now - stamp) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        cache.set(key, (tokens, now), math.ceil(capacity / rate))
+    return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+
+def take(name, capacity, rate):
+    """Take a token from the bucket `name`. Returns (allowed, seconds until a token is available)."""
+    cache = caches["default"]
+    key = cache.make_and_validate_key(f"ratelimit:{name}")
+    if isinstance(cache, RedisCache):
+        return redis_take(cache, key, capacity, rate)
+    return local_take(cache, key, capacity, rate)
+
+
+def check(request, view_name):
+    """Seconds the client must wait before calling `view_name` again, or 0 if the request may go ahead."""
+    limits = settings.RATE_LIMITS.get(view_name)
+    if not limits or request.method not in limits.get("methods", [request.method]):
+        return 0
+    wait = 0
+    for scope, rate in limits.items():
+        if scope == "methods":
+            continue
+        if scope == "user" and request.user.is_authenticated:
+            identity = f"user:{request.user.pk}"
+        else:
+            identity = f"ip:{client_ip(request)}"
+        capacity, per_second = parse_rate(rate)
+        try:
+            allowed, retry_after = take(f"{view_name}:{scope}:{identity}", capacity, per_second)
+        except Exception:
+            logger.exception("Rate limit cache unavailable; allowing the request.")
+            return 0
+        if not allowed:
+            wait = max(wait, retry_after)
+    return wait
+
+
+class RateLimitMiddleware(MiddlewareMixin):
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.RATE_LIMIT_ENABLED:
+            return None
+        wait = check(request, request.resolver_match.view_name)
+        if wait:
+            retry_after = max(1, math.ceil(wait))
+            response = HttpResponse(
+                f"Too many requests. Please try again in {retry_after} seconds.\n",
+                status=429, content_type="text/plain",
+            )
+            response["Retry-After"] = str(retry_after)
+            return response
+        return None
@@ -0,0 +1,162 @@
+"""
+Sampling profiler for slow requests.
+
+While profiling is on, a daemon thread per process wakes every
+PROFILING_INTERVAL_MS and records the Python stack of each thread that is
+serving a request. Requests slower than the threshold, plus a random
+PROFILING_SAMPLE_RATE fraction of all requests, have their stacks written to
+PROFILING_DIR as a collapsed-stack file (one "frame;frame;frame count" line
+per distinct stack). The file name starts with the URL name and ends with the
+latency. Load a file into https://www.speedscope.app or pipe it to
+flamegraph.pl for a flame graph.
+
+Profiling is off unless PROFILING=1. It can also be switched on and tuned at
+runtime from the admin (`ProfilingSwitch`); every process re-reads the switch
+every PROFILING_SWITCH_REFRESH seconds. When profiling is off, a request costs
+a clock read and a comparison. Only WSGI requests are profiled: under ASGI,
+async views share the event loop thread, so stacks cannot be attributed to a
+single request.
+"""
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils import timezone
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+_switch = {"checked": None, "config": None}
+
+
+def current_config():
+    """(enabled, threshold in seconds, sample rate) from the admin switch if one is saved, else from settings."""
+    now = time.monotonic()
+    checked = _switch["checked"]
+    if checked is not None and now - checked < settings.PROFILING_SWITCH_REFRESH:
+        return _switch["config"]
+    from .models import ProfilingSwitch
+
+    try:
+        row = ProfilingSwitch.objects.filter(pk=1).values_list("enabled", "threshold_ms", "sample_rate").first()
+    except Exception:
+        # Not migrated yet, or the database is down: fall back to settings.
+        logger.debug("Could not read the profiling switch.", exc_info=True)
+        row = None
+    if row is None:
+        row = (settings.PROFILING_ENABLED, settings.PROFILING_THRESHOLD_MS, settings.PROFILING_SAMPLE_RATE)
+    enabled, threshold_ms, sample_rate = row
+    _switch["config"] = (enabled, threshold_ms / 1000, sample_rate)
+    _switch["checked"] = now
+    return _switch["config"]
+
+
+def collapse(frame):
+    """The stack ending at `frame` as "module:function;...", outermost call first."""
+    names = []
+    while frame is not None:
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Sampler:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.active = {}  # thread ident -> Counter of collapsed stacks
+        self.pid = None
+
+    def begin(self):
+        """Start sampling the calling thread. Returns the Counter its stacks are added to."""
+        stacks = Counter()
+        with self.lock:
+            if self.pid != os.getpid():
+                self.start()
+            self.active[threading.get_ident()] = stacks
+        self.wake.set()
+        return stacks
+
+    def end(self):
+        with self.lock:
+            self.active.pop(threading.get_ident(), None)
+
+    def start(self):
+        """Start this process's sampling thread (again after a fork, where threads do not survive)."""
+        self.pid = os.getpid()
+        threading.Thread(target=self.run, name="request-profiler", daemon=True).start()
+
+    def run(self):
+        while True:
+            self.wake.wait()
+            time.sleep(settings.PROFILING_INTERVAL_MS / 1000)
+            # Held while recording, so a request's stacks are final once end() returns.
+            with self.lock:
+                if not self.active:
+                    # Sleep until the next profiled request.
+                    self.wake.clear()
+                    continue
+                frames = sys._current_frames()
+                for ident, stacks in self.active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stacks[collapse(frame)] += 1
+                del frames
+
+
+sampler = Sampler()
+
+
+def save(request, stacks, elapsed):
+    """Write the request's stacks to PROFILING_DIR and drop the oldest files beyond PROFILING_MAX_FILES."""
+    view_name = request.resolver_match.view_name if request.resolver_match else "unresolved"
+    directory = settings.PROFILING_DIR
+    os.makedirs(directory, exist_ok=True)
+    stamp = timezone.now().strftime("%Y%m%dT%H%M%S%f")
+    path = os.path.join(directory, f"{view_name.replace(':', '.')}-{stamp}-{os.getpid()}-{elapsed * 1000:.0f}ms.collapsed")
+    with open(path, "w") as f:
+        f.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(".collapsed")),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in profiles[:max(0, len(profiles) - settings.PROFILING_MAX_FILES)]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # another worker pruned it
+    return path
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    def process_request(self, request):
+        enabled, threshold, sample_rate = current_config()
+        if not enabled or isinstance(request, ASGIRequest):
+            return None
+        sampled = sample_rate > 0 and random.random() < sample_rate
+        request._profile = (sampler.begin(), time.perf_counter(), threshold, sampled)
+        return None
+
+    def process_response(self, request, response):
+        profile = getattr(request, "_profile", None)
+        if profile is None:
+            return response
+        sampler.end()
+        stacks, start, threshold, sampled = profile
+        elapsed = time.perf_counter() - start
+        if stacks and (sampled or elapsed >= threshold):
+            try:
+                path = save(request, stacks, elapsed)
+            except OSError:
+                logger.exception("Could not save a request profile.")
+            else:
+                logger.info("%s %s took %.0f ms; profile saved to %s", request.method, request.path, elapsed * 1000, path)
+        return response
@@ -0,0 +1,192 @@
+"""
+Slow query log.
+
+When SLOW_QUERY_MS is set, every query slower than it is appended as one JSON
+line to SLOW_QUERY_LOG in SLOW_QUERY_LOG_DIR (and logged as a warning). Each
+entry records:
+
+- the fingerprint: the SQL with literals, placeholders, IN lists and
+  bulk_update CASE arms normalized, so `... WHERE id = 1` and `... WHERE id = 2` group together;
+- the URL name of the request that ran it (or "background" for threads and
+  commands);
+- the innermost project frame that issued it, e.g.
+  "products/views.py:412 in product_detail_view";
+- the EXPLAIN plan, for SELECTs. It is captured once per fingerprint per
+  process every SLOW_QUERY_EXPLAIN_INTERVAL seconds, inside a savepoint when a
+  transaction is open, so a failing EXPLAIN cannot break the request.
+
+`python manage.py slow_query_report` aggregates the log by fingerprint. The
+log is rotated to SLOW_QUERY_LOG + ".1" at SLOW_QUERY_LOG_MAX_BYTES. Queries
+under the threshold cost a clock read and a comparison; with the log off, none
+of this is installed.
+"""
+
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import transaction
+from django.db.backends import utils as backend_utils
+from django.utils import timezone
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|\?")
+IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+REPEATED_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+WHITESPACE = re.compile(r"\s+")
+REPEATED_CASES = re.compile(r"(WHEN \([^()]*\) THEN \?)(?: \1)+")  # bulk_update
+
+current_request = contextvars.ContextVar("slow_query_request", default=None)
+_local = threading.local()
+_explained = {}  # fingerprint -> monotonic time of its last EXPLAIN in this process
+_write_lock = threading.Lock()
+
+
+def normalize(sql):
+    sql = LITERALS.sub("?", sql)
+    sql = REPEATED_LISTS.sub("(...)", IN_LISTS.sub("(...)", sql))
+    return REPEATED_CASES.sub(r"\1 ...", WHITESPACE.sub(" ", sql).strip())
+
+
+def fingerprint(normalized):
+    return hashlib.md5(normalized.encode(), usedforsecurity=False).hexdigest()[:12]
+
+
+def current_view():
+    request = current_request.get()
+    if request is None:
+        return "background"
+    match = request.resolver_match
+    return match.view_name if match else request.path
+
+
+def origin():
+    """The innermost project frame that issued the query, as "path:line in function"."""
+    frame = sys._getframe(1)
+    # Skip the execute wrappers, which run below Django's CursorWrapper.
+    while frame is not None and frame.f_code.co_filename != backend_utils.__file__:
+        frame = frame.f_back
+    base = str(settings.BASE_DIR) + os.sep
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(base) and "site-packages" not in path:
+            return f"{os.path.relpath(path, base)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def explain(connection, sql, params, key):
+    """The query plan as text, or None if this fingerprint was explained recently or cannot be."""
+    statement = sql.split(None, 1)[0].upper() if sql.strip() else ""
+    if statement not in ("SELECT", "WITH") or not connection.features.supports_explaining_query_execution:
+        return None
+    now = time.monotonic()
+    last = _explained.get(key)
+    if last is not None and now - last < settings.SLOW_QUERY_EXPLAIN_INTERVAL:
+        return None
+    _explained[key] = now
+    _local.explaining = True
+    try:
+        # A savepoint keeps a failed EXPLAIN from aborting the caller's transaction (PostgreSQL).
+        with transaction.atomic(using=connection.alias, savepoint=connection.in_atomic_block):
+            with connection.cursor() as cursor:
+                cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+                rows = cursor.fetchall()
+    except Exception:
+        logger.debug("Could not EXPLAIN a slow query.", exc_info=True)
+        return None
+    finally:
+        _local.explaining = False
+    return "\n".join(row[0] if len(row) == 1 else " ".join(str(column) for column in row) for row in rows)
+
+
+def write(entry):
+    path = settings.SLOW_QUERY_LOG
+    line = json.dumps(entry) + "\n"
+    with _write_lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            f.write(line)
+            size = f.tell()
+        if size > settings.SLOW_QUERY_LOG_MAX_BYTES:
+            os.replace(path, f"{path}.1")
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    if getattr(_local, "explaining", False):
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    elapsed = (time.perf_counter() - start) * 1000
+    if elapsed < settings.SLOW_QUERY_MS:
+        return result
+
+    connection = context["connection"]
+    normalized = normalize(sql)
+    key = fingerprint(normalized)
+    entry = {
+        "time": timezone.now().isoformat(),
+        "fingerprint": key,
+        "sql": normalized,
+        "duration_ms": round(elapsed, 2),
+        "alias": connection.alias,
+        "view": current_view(),
+        "origin": origin(),
+        "plan": None if many else explain(connection, sql, params, key),
+    }
+    logger.warning("Slow query (%.0f ms) from %s at %s: %s", elapsed, entry["view"], entry["origin"], normalized[:200])
+    try:
+        write(entry)
+    except OSError:
+        logger.exception("Could not write the slow query log.")
+    return result
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """connection_created receiver that installs the slow query log. The signal fires on every reconnect."""
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_queries)
+
+
+@sync_and_async_middleware
+def slow_query_middleware(get_response):
+    """Make the request visible to the slow query log, so entries name the view that ran them."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = current_request.set(request)
+            try:
+                return await get_response(request)
+            finally:
+                current_request.reset(token)
+    else:
+        def middleware(request):
+            token = current_request.set(request)
+            try:
+                return get_response(request)
+            finally:
+                current_request.reset(token)
+    return middleware
+
+
+def read_log(path):
+    """Entries from the rotated log and then the current one (oldest first), skipping torn lines."""
+    for name in (f"{path}.1", str(path)):
+        try:
+            with open(name) as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            continue
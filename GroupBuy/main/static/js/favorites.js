@@ -0,0 +1,24 @@
+// Heart buttons on product grids: toggle the favorite over JSON and flip the icon
+// in place. Without JavaScript the link falls back to the redirecting toggle view.
+document.addEventListener("click", async (event) => {
+    const link = event.target.closest("[data-favorite-url]");
+    if (!link) return;
+    event.preventDefault();
+
+    const csrfToken = document.querySelector('meta[name="csrf-token"]').content;
+    const response = await fetch(link.dataset.favoriteUrl, {
+        method: "POST",
+        headers: {"X-CSRFToken": csrfToken},
+    });
+    if (!response.ok) {
+        window.location.href = link.href;
+        return;
+    }
+    const data = await response.json();
+    // The same product can appear in several grids on one page.
+    document.querySelectorAll(`[data-favorite-url="${link.dataset.favoriteUrl}"] i`).forEach((icon) => {
+        icon.classList.toggle("bi-heart-fill", data.favorited);
+        icon.classList.toggle("text-danger", data.favorited);
+        icon.classList.toggle("bi-heart", !data.favorited);
+    });
+});
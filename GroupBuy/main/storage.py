@@ -0,0 +1,23 @@
+from django.core.files.storage import FileSystemStorage
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticStorage(CompressedManifestStaticFilesStorage):
+    """
+    Content-hashed, gzip/brotli pre-compressed static files.
+
+    `collectstatic` writes staticfiles.json, which is loaded into memory once
+    per process, so `{% static %}` is a dict lookup. Hashed names are used even
+    with DEBUG on (this project runs that way on Railway). Before a manifest has
+    been collected (tests, fresh checkouts), and for files added since the last
+    collectstatic, plain names are returned.
+    """
+
+    def url(self, name, force=False):
+        if not self.hashed_files:
+            return FileSystemStorage.url(self, name)
+        try:
+            return super().url(name, force=True)
+        except ValueError:
+            # Not in the manifest: a new file, not collected yet.
+            return FileSystemStorage.url(self, name)
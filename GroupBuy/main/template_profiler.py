@@ -0,0 +1,68 @@
+"""
+Per-template render timing.
+
+Inside `profile_templates()` every Django and Jinja2 template render is
+timed. Inclusive time counts nested includes/extends, self time excludes them,
+and the render count shows how often a template is included.
+"""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.template.base import Template
+
+
+class TemplateStats:
+    def __init__(self):
+        self.renders = defaultdict(int)
+        self.total = defaultdict(float)
+        self.self_time = defaultdict(float)
+
+    def record(self, name, elapsed, own):
+        self.renders[name] += 1
+        self.total[name] += elapsed
+        self.self_time[name] += own
+
+    def rows(self):
+        """(name, renders, inclusive seconds, self seconds), slowest self time first."""
+        return sorted(
+            ((name, self.renders[name], self.total[name], self.self_time[name]) for name in self.renders),
+            key=lambda row: row[3], reverse=True,
+        )
+
+
+def timed(render, get_name, stats, stack):
+    def wrapper(template, *args, **kwargs):
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return render(template, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            stats.record(get_name(template), elapsed, elapsed - children)
+    return wrapper
+
+
+@contextmanager
+def profile_templates():
+    """Patch template rendering for the duration of the block (not thread-safe; meant for tooling)."""
+    stats = TemplateStats()
+    stack = []
+    patched = [(Template, "_render", Template._render)]
+    Template._render = timed(Template._render, lambda t: t.origin.template_name or "<string>", stats, stack)
+    try:
+        from django.template.backends.jinja2 import Template as JinjaTemplate
+    except ImportError:
+        JinjaTemplate = None
+    if JinjaTemplate is not None:
+        patched.append((JinjaTemplate, "render", JinjaTemplate.render))
+        JinjaTemplate.render = timed(JinjaTemplate.render, lambda t: f"{t.template.name} (jinja2)", stats, stack)
+    try:
+        yield stats
+    finally:
+        for owner, attribute, original in patched:
+            setattr(owner, attribute, original)
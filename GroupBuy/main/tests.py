@@ -1,3 +1,341 @@
-from django.test import TestCase
+import io
+import os
+import runpy
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import GroupPurchase, Order
+from products import view_counter
+from products.models import PriceTier, Product, Review
+from . import paginators, request_profiler, slow_queries, views
+from .datagen import DEFAULT_NOW, DataGenerator
+from .paginators import EstimatedCountPaginator
+from .storage import StaticStorage
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=30)
+class AnonymousPageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_visitors_share_the_cached_page(self):
+        self.assertEqual(self.client.get(reverse('main:home_view'))['X-Page-Cache'], 'miss')
+        self.assertEqual(self.client.get(reverse('main:home_view'))['X-Page-Cache'], 'hit')
+
+    def test_signed_in_users_bypass_the_cache(self):
+        self.client.get(reverse('main:home_view'))
+        self.client.force_login(User.objects.create_user('ann', password='pass-1234'))
+
+        response = self.client.get(reverse('main:home_view'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Page-Cache', response)
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_disabled_cache_is_never_used(self):
+        self.client.get(reverse('main:home_view'))
+        self.assertNotIn('X-Page-Cache', self.client.get(reverse('main:home_view')))
+
+
+class StaticStorageTest(TestCase):
+    def setUp(self):
+        self.storage = StaticStorage()
+        self.storage.hashed_files = {'css/site.css': 'css/site.0123456789ab.css'}
+
+    def test_collected_files_get_hashed_names(self):
+        self.assertEqual(self.storage.url('css/site.css'), '/static/css/site.0123456789ab.css')
+
+    def test_files_missing_from_the_manifest_get_plain_names(self):
+        self.assertEqual(self.storage.url('js/favorites.js'), '/static/js/favorites.js')
+
+
+class CatalogVersionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_listing_etag_changes_when_a_product_is_saved_without_reading_products(self):
+        first = self.client.get(reverse('products:all_product_view'))
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(reverse('products:all_product_view'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        seller = User.objects.create_user('seller', password='pass-1234')
+        Product.objects.create(
+            seller=seller, name='Kettle', price=10, description='A kettle', category='Electronics',
+            brand='Acme', colour='Black', size='M', quantity=1,
+        )
+        changed = self.client.get(reverse('products:all_product_view'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+
+class MetricsTest(TestCase):
+    def test_scrape_includes_view_buffer_gauges(self):
+        view_counter.buffer.add(1, 3)
+        try:
+            body = self.client.get(reverse('main:metrics_view')).content.decode()
+        finally:
+            view_counter.buffer.take()
+
+        self.assertIn('groupbuy_view_counter_pending_views 3.0', body)
+        self.assertIn('groupbuy_view_counter_flush_lag_seconds', body)
+        self.assertIn('groupbuy_queue_depth{queue="payments"} 0.0', body)
+
+
+class DataGeneratorTest(TestCase):
+    def generate(self, prefix):
+        DataGenerator(seed=7, batch_size=20, prefix=prefix).run(
+            sellers=3, buyers=30, products=25, groups=8, orders=60, reviews=40,
+        )
+
+        def rows(queryset, *fields):
+            return [
+                tuple(value.removeprefix(prefix) if isinstance(value, str) else value for value in row)
+                for row in queryset.order_by('id').values_list(*fields)
+            ]
+
+        mine = {'seller__username__startswith': f'{prefix}_'}
+        return {
+            'products': rows(
+                Product.objects.filter(**mine), 'seller__username', 'name', 'price', 'group_price',
+                'max_participants', 'quantity', 'popularity',
+            ),
+            'tiers': rows(PriceTier.objects.filter(product__seller__username__startswith=f'{prefix}_'), 'product__name', 'min_participants', 'price'),
+            'groups': rows(GroupPurchase.objects.filter(product__seller__username__startswith=f'{prefix}_'), 'product__name', 'is_active', 'is_private', 'total_price'),
+            'orders': rows(
+                Order.objects.filter(user__username__startswith=f'{prefix}_'), 'user__username', 'product__name',
+                'group_purchase__product__name', 'quantity', 'unit_price', 'total_price', 'created_at',
+            ),
+            'reviews': rows(Review.objects.filter(user__username__startswith=f'{prefix}_'), 'user__username', 'product__name', 'rating', 'created_at'),
+        }
+
+    def test_same_seed_gives_identical_rows(self):
+        first = self.generate('one')
+        second = self.generate('two')
+
+        self.assertEqual(sum(1 for row in first['orders'] if row[2] is None), 60)
+        self.assertEqual(first, second)
+
+    def test_created_at_keeps_the_generated_history(self):
+        self.generate('one')
+
+        created = Order.objects.values_list('created_at', flat=True)
+        self.assertLessEqual(max(created), DEFAULT_NOW)
+        self.assertLess(min(created), DEFAULT_NOW - timedelta(days=30))
+        self.assertTrue(Order._meta.get_field('created_at').auto_now_add)
+
+
+@override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1000)
+class EstimatedCountPaginatorTest(TestCase):
+    def setUp(self):
+        seller = User.objects.create_user('seller', password='pass-1234')
+        for i in range(3):
+            Product.objects.create(
+                seller=seller, name=f'Kettle {i}', price=10, description='A kettle', category='Electronics',
+                brand='Acme', colour='Black', size='M', quantity=1,
+            )
+
+    def count(self, queryset):
+        return EstimatedCountPaginator(queryset.order_by('id'), 10).count
+
+    def postgres(self, reltuples):
+        """Stand in for a PostgreSQL connection whose planner estimates `reltuples` rows."""
+        connection = mock.MagicMock(vendor='postgresql')
+        connection.cursor.return_value.__enter__.return_value.fetchone.return_value = (reltuples,)
+        return mock.patch.object(paginators, 'connections', {'default': connection})
+
+    def test_large_unfiltered_table_uses_the_estimate(self):
+        with self.postgres(2_500_000.0), self.assertNumQueries(0):
+            self.assertEqual(self.count(Product.objects.all()), 2_500_000)
+
+    def test_small_tables_get_an_exact_count(self):
+        with self.postgres(40.0):
+            self.assertEqual(self.count(Product.objects.all()), 3)
+
+    def test_unanalyzed_tables_get_an_exact_count(self):
+        with self.postgres(-1.0):
+            self.assertEqual(self.count(Product.objects.all()), 3)
+
+    def test_filtered_querysets_get_an_exact_count(self):
+        with self.postgres(2_500_000.0):
+            self.assertEqual(self.count(Product.objects.filter(name='Kettle 1')), 1)
+            self.assertEqual(self.count(Product.objects.distinct()), 3)
+            paginators.connections['default'].cursor.assert_not_called()
+
+    def test_other_databases_get_an_exact_count(self):
+        self.assertEqual(self.count(Product.objects.all()), 3)
+
+    def test_changelists_using_it_load(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass-1234'))
+        model_admins = [
+            model_admin for model_admin in admin.site._registry.values()
+            if model_admin.paginator is EstimatedCountPaginator
+        ]
+        self.assertTrue(model_admins)
+        for model_admin in model_admins:
+            opts = model_admin.model._meta
+            with self.subTest(model=opts.label):
+                response = self.client.get(reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist'))
+                self.assertEqual(response.status_code, 200)
+
+
+class SessionSettingsTest(TestCase):
+    def session_engine(self, **environ):
+        # A developer's .env must not leak into the environment under test.
+        with mock.patch.dict(os.environ, environ, clear=True), mock.patch('dotenv.load_dotenv'):
+            return runpy.run_path(settings.BASE_DIR / 'GroupBuy' / 'settings.py')['SESSION_ENGINE']
+
+    def test_each_mode_selects_its_engine(self):
+        for mode, engine in [
+            ('db', 'django.contrib.sessions.backends.db'),
+            ('cached_db', 'django.contrib.sessions.backends.cached_db'),
+            ('signed_cookies', 'django.contrib.sessions.backends.signed_cookies'),
+        ]:
+            with self.subTest(mode=mode):
+                self.assertEqual(self.session_engine(SESSION_MODE=mode), engine)
+
+    def test_default_mode_follows_redis(self):
+        self.assertEqual(self.session_engine(), 'django.contrib.sessions.backends.db')
+        self.assertEqual(
+            self.session_engine(REDIS_URL='redis://localhost:6379/0'), 'django.contrib.sessions.backends.cached_db',
+        )
+
+
+class SweepSessionsTest(TestCase):
+    def create_sessions(self, prefix, count, expires_in):
+        Session.objects.bulk_create([
+            Session(session_key=f'{prefix}{i}', session_data='', expire_date=timezone.now() + expires_in)
+            for i in range(count)
+        ])
+
+    def test_expired_sessions_are_deleted_in_batches(self):
+        self.create_sessions('old', 5, timedelta(days=-1))
+        self.create_sessions('live', 3, timedelta(days=1))
+        out = io.StringIO()
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('sweep_sessions', batch_size=2, stdout=out)
+
+        self.assertEqual(sum(query['sql'].startswith('DELETE') for query in queries.captured_queries), 3)
+        self.assertEqual(sorted(Session.objects.values_list('session_key', flat=True)), ['live0', 'live1', 'live2'])
+        self.assertIn('Deleted 5 expired sessions.', out.getvalue())
+
+    @override_settings(SESSION_MODE='signed_cookies')
+    def test_cookie_sessions_have_nothing_to_sweep(self):
+        self.create_sessions('old', 1, timedelta(days=-1))
+        call_command('sweep_sessions', stdout=io.StringIO())
+        self.assertTrue(Session.objects.exists())
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0, PROFILING_INTERVAL_MS=1, PROFILING_THRESHOLD_MS=60000)
+class RequestProfilerTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        # The switch is cached per process; don't let this test's settings outlive it.
+        self.addCleanup(request_profiler._switch.update, checked=None)
+
+    def get_home(self):
+        home_rails = views.home_rails
+
+        def slow_rails():
+            time.sleep(0.05)  # long enough for the sampler to catch the view
+            return home_rails()
+
+        with override_settings(PROFILING_DIR=self.directory), mock.patch.object(views, 'home_rails', slow_rails):
+            request_profiler._switch['checked'] = None  # re-read the overridden settings
+            return self.client.get(reverse('main:home_view'))
+
+    def profiles(self):
+        return sorted(os.listdir(self.directory))
+
+    @override_settings(PROFILING_ENABLED=False, PROFILING_SAMPLE_RATE=1)
+    def test_disabled_profiler_does_nothing(self):
+        with mock.patch.object(request_profiler.sampler, 'begin') as begin:
+            response = self.get_home()
+
+        self.assertEqual(response.status_code, 200)
+        begin.assert_not_called()
+        self.assertEqual(self.profiles(), [])
+
+    def test_sampled_request_saves_a_profile_and_keeps_the_response(self):
+        with override_settings(PROFILING_ENABLED=False):
+            plain = self.get_home()
+        with override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1):
+            profiled = self.get_home()
+
+        self.assertEqual(profiled.status_code, plain.status_code)
+        self.assertEqual(profiled.content, plain.content)
+        [name] = self.profiles()
+        self.assertTrue(name.startswith('main.home_view-') and name.endswith('ms.collapsed'))
+        with open(os.path.join(self.directory, name)) as f:
+            self.assertIn('main.views:home_view', f.read())
+
+
+class SlowQueryLogTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log = os.path.join(directory.name, 'logs', 'slow_queries.jsonl')
+        slow_queries._explained.clear()
+
+    def test_literals_and_in_lists_share_a_fingerprint(self):
+        first = slow_queries.normalize("SELECT * FROM product WHERE id = 1 AND name = 'it''s' AND id IN (1, 2, 3)")
+        second = slow_queries.normalize("SELECT  *  FROM product\nWHERE id = %s AND name = %s AND id IN (%s, %s)")
+
+        self.assertEqual(first, 'SELECT * FROM product WHERE id = ? AND name = ? AND id IN (...)')
+        self.assertEqual(first, second)
+        self.assertEqual(slow_queries.fingerprint(first), slow_queries.fingerprint(second))
+        self.assertNotEqual(
+            slow_queries.fingerprint(first), slow_queries.fingerprint(slow_queries.normalize('SELECT * FROM product WHERE price = 1')),
+        )
+
+    def test_bulk_inserts_of_any_size_share_a_fingerprint(self):
+        self.assertEqual(
+            slow_queries.normalize("INSERT INTO tag (name, rank) VALUES ('a', 1), ('b', 2), ('c', 3)"),
+            slow_queries.normalize("INSERT INTO tag (name, rank) VALUES (%s, %s)"),
+        )
+
+    @override_settings(SLOW_QUERY_MS=0)  # the log is installed by hand below, and every query counts as slow
+    def test_report_ranks_logged_fingerprints(self):
+        with override_settings(SLOW_QUERY_LOG=self.log), connection.execute_wrapper(slow_queries.log_slow_queries), \
+                self.assertLogs('main.slow_queries', 'WARNING'):
+            for product_id in range(3):
+                list(Product.objects.filter(id=product_id))
+            Product.objects.filter(name='Kettle').exists()
+        entries = list(slow_queries.read_log(self.log))
+        [repeated] = {entry['fingerprint'] for entry in entries if entry['sql'].endswith('= ?')}
+
+        out = io.StringIO()
+        call_command('slow_query_report', log=self.log, sort='count', top=1, stdout=out)
+        report = out.getvalue()
+
+        self.assertEqual(len(entries), 4)
+        self.assertTrue(report.startswith('2 fingerprints, 4 slow queries.'))
+        self.assertIn(f'#1 {repeated}: 3 queries', report)
+        self.assertNotIn('#2 ', report)
+        self.assertIn('views:   background (3)', report)
+        self.assertIn('origins: main/tests.py:', report)
+        self.assertIn('plan:', report)
+        out = io.StringIO()
+        call_command('slow_query_report', log=self.log, no_plans=True, stdout=out)
+        self.assertNotIn('plan:', out.getvalue())
+
+    def test_report_on_an_empty_log(self):
+        out = io.StringIO()
+        call_command('slow_query_report', log=self.log, stdout=out)
+        self.assertEqual(out.getvalue(), f'No slow queries logged in {self.log}.\n')
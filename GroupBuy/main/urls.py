@@ -1,10 +1,12 @@
 from django.urls import path
+from django.conf import settings
 from . import views
 app_name = "main"
 
 urlpatterns = [
-  path('', views.home_view, name='home_view'),
+  path('', views.async_home_view if settings.ASYNC_READ_VIEWS else views.home_view, name='home_view'),
   path('contact/', views.contact_view, name="contact_view"),
+  path('metrics', views.metrics_view, name="metrics_view"),
 
 
 
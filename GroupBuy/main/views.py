@@ -1,16 +1,56 @@
 from django.shortcuts import render
+from asgiref.sync import sync_to_async
 from django.http import HttpRequest, HttpResponse
 from products.models import Product
+from products.views import catalog_version
+from products import popularity
+from main.conditional import conditional_page
+from main.page_cache import anonymous_page_cache
+from main import metrics
 from .models import Contact
 from django.core.mail import EmailMessage
 from django.conf import settings
+from django.utils.crypto import constant_time_compare
 from django.template.loader import render_to_string
 from django.contrib import messages
+import time
+
+# Seconds between refreshes of the trending rails for revalidating browsers.
+HOME_RAILS_REFRESH = 300
 
 # Create your views here.
+def home_version(request:HttpRequest):
+  """
+  Catalog version plus a time bucket: the trending rails move without any product being edited.
+  """
+  version = catalog_version(request)
+  if version is None:
+    return None
+  parts, last_modified = version
+  return (parts, int(time.time() // HOME_RAILS_REFRESH)), last_modified
+
+
+def home_rails():
+  return {
+    'trending_products': list(popularity.top(limit=4)),
+    'favorite_products': list(popularity.top(by='favorite_count', limit=4)),
+  }
+
+
+@anonymous_page_cache("catalog")
+@conditional_page(home_version)
 def home_view(request:HttpRequest):
   products = Product.objects.all()[0:4]
-  return render(request, "main/index.html", {'products':products})
+  return render(request, "main/index.html", {'products':products, **home_rails()})
+
+
+@anonymous_page_cache("catalog")
+@conditional_page(home_version)
+async def async_home_view(request:HttpRequest):
+  """Async version of home_view, used when settings.ASYNC_READ_VIEWS is on."""
+  products = [product async for product in Product.objects.all()[0:4]]
+  rails = await sync_to_async(home_rails)()
+  return await sync_to_async(render)(request, "main/index.html", {'products':products, **rails})
 
 
 def contact_view(request:HttpRequest):
@@ -25,9 +65,17 @@ def contact_view(request:HttpRequest):
         email_message = EmailMessage("confiramation", content_html, settings.EMAIL_HOST_USER, [send_to])
         email_message.content_subtype = "html"
         #email_message.connection = email_message.get_connection(True)
-        email_message.send()
+        with metrics.counting_email("contact"):
+            email_message.send()
 
         messages.success(request, "Your message is received. Thank You.", "alert-success")
 
     return render(request, 'main/contact.html' )
 
+
+def metrics_view(request:HttpRequest):
+  """Prometheus scrape endpoint (main/metrics.py)."""
+  token = settings.METRICS_TOKEN
+  if token and not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+    return HttpResponse("Unauthorized\n", status=401, content_type="text/plain")
+  return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -1,6 +1,57 @@
 from django.contrib import admin
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from main.paginators import EstimatedCountPaginator
 from .models import Order, GroupPurchase, PaymentTest
 # Register your models here.
-admin.site.register(Order)
-admin.site.register(GroupPurchase)
-admin.site.register(PaymentTest)
\ No newline at end of file
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'product', 'order_type', 'quantity', 'total_price', 'payment_status', 'group_purchase_id', 'created_at')
+    list_select_related = ('user', 'product')
+    list_filter = ('order_type', 'payment_status')
+    search_fields = ('=user__username',)
+    search_help_text = "Exact buyer username."
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('user', 'product', 'group_purchase')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(GroupPurchase)
+class GroupPurchaseAdmin(admin.ModelAdmin):
+    list_display = ('id', 'product', 'participant_count', 'is_active', 'is_private', 'total_price', 'updated_at')
+    list_select_related = ('product',)
+    list_filter = ('is_active', 'is_private')
+    search_fields = ('=product__sku',)
+    search_help_text = "Exact product SKU."
+    date_hierarchy = 'updated_at'
+    raw_id_fields = ('product', 'participants')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # A correlated subquery only counts the participants of the rows on the page.
+        participants = (
+            GroupPurchase.participants.through.objects.filter(grouppurchase_id=OuterRef('pk'))
+            .values('grouppurchase_id').annotate(count=Count('*')).values('count')
+        )
+        return super().get_queryset(request).annotate(participant_count=Coalesce(Subquery(participants), 0))
+
+    @admin.display(description='participants')
+    def participant_count(self, obj):
+        return obj.participant_count
+
+
+@admin.register(PaymentTest)
+class PaymentTestAdmin(admin.ModelAdmin):
+    list_display = ('id', 'order_id', 'user', 'name', 'status', 'gateway_reference', 'created_at')
+    list_select_related = ('user',)
+    list_filter = ('status',)
+    search_fields = ('=gateway_reference', '=user__username')
+    search_help_text = "Exact gateway reference or username."
+    date_hierarchy = 'created_at'
+    raw_id_fields = ('user', 'order', 'group_purchase')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
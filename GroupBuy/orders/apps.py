@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
 
 
 class OrdersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "orders"
+
+    def ready(self):
+        from .payments import start_sweeper
+        request_started.connect(start_sweeper)
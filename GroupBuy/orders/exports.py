@@ -0,0 +1,172 @@
+"""
+Streaming exports of a seller's orders and group purchases.
+
+Rows come from a single `values_list()` query read with `.iterator()`,
+EXPORT_CHUNK_SIZE rows at a time. Each chunk is encoded and handed to the
+StreamingHttpResponse before the next one is fetched. Memory stays at one
+chunk however many rows are exported, and the download starts at once. On
+PostgreSQL the iterator reads through a server-side cursor.
+
+Order rows carry their group purchase and their latest payment attempt (via
+subqueries), so nothing is looked up per row.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, OuterRef, Subquery
+from django.utils import timezone
+
+from .models import GroupPurchase, Order, PaymentTest
+
+EXPORT_CHUNK_SIZE = 2000
+
+ORDER_COLUMNS = {
+    "order_id": "id",
+    "created_at": "created_at",
+    "product_id": "product_id",
+    "product_name": "product__name",
+    "product_sku": "product__sku",
+    "buyer": "user__username",
+    "quantity": "quantity",
+    "unit_price": "unit_price",
+    "total_price": "total_price",
+    "order_type": "order_type",
+    "payment_status": "payment_status",
+    "group_purchase_id": "group_purchase_id",
+    "group_is_active": "group_purchase__is_active",
+    "group_total_price": "group_purchase__total_price",
+    "payment_id": "payment_id",
+    "payment_attempt_status": "payment_attempt_status",
+    "gateway_reference": "gateway_reference",
+}
+
+GROUP_PURCHASE_COLUMNS = {
+    "group_purchase_id": "id",
+    "updated_at": "updated_at",
+    "product_id": "product_id",
+    "product_name": "product__name",
+    "product_sku": "product__sku",
+    "is_active": "is_active",
+    "is_private": "is_private",
+    "participants": "participant_count",
+    "total_price": "total_price",
+}
+
+
+def date_range(queryset, field, start=None, end=None):
+    """Filter `field` to the local days start..end (inclusive); either may be None."""
+    if start:
+        queryset = queryset.filter(**{f"{field}__gte": timezone.make_aware(datetime.combine(start, time.min))})
+    if end:
+        queryset = queryset.filter(**{f"{field}__lt": timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))})
+    return queryset
+
+
+def seller_orders(seller, start=None, end=None):
+    latest_payment = PaymentTest.objects.filter(order=OuterRef("pk")).order_by("-id")
+    orders = (
+        Order.objects.filter(product__seller=seller)
+        .annotate(
+            payment_id=Subquery(latest_payment.values("id")[:1]),
+            payment_attempt_status=Subquery(latest_payment.values("status")[:1]),
+            gateway_reference=Subquery(latest_payment.values("gateway_reference")[:1]),
+        )
+        .order_by("id")
+    )
+    return ORDER_COLUMNS, date_range(orders, "created_at", start, end).values_list(*ORDER_COLUMNS.values())
+
+
+def seller_group_purchases(seller, start=None, end=None):
+    group_purchases = (
+        GroupPurchase.objects.filter(product__seller=seller)
+        .annotate(participant_count=Count("participants"))
+        .order_by("id")
+    )
+    return GROUP_PURCHASE_COLUMNS, date_range(group_purchases, "updated_at", start, end).values_list(*GROUP_PURCHASE_COLUMNS.values())
+
+
+EXPORTS = {
+    "orders": seller_orders,
+    "group_purchases": seller_group_purchases,
+}
+
+
+class CsvEncoder:
+    content_type = "text/csv"
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+
+    def header(self):
+        return self.encode([self.columns])
+
+    def encode(self, rows):
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+        )
+        return out.getvalue()
+
+    def footer(self):
+        return ""
+
+
+class JsonEncoder:
+    """A JSON array of objects, written one chunk at a time."""
+    content_type = "application/json"
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.first = True
+
+    def header(self):
+        return "["
+
+    def encode(self, rows):
+        if not rows:
+            return ""
+        objects = ",\n".join(json.dumps(dict(zip(self.columns, row)), cls=DjangoJSONEncoder) for row in rows)
+        separator = "\n" if self.first else ",\n"
+        self.first = False
+        return separator + objects
+
+    def footer(self):
+        return "\n]\n"
+
+
+ENCODERS = {
+    "csv": CsvEncoder,
+    "json": JsonEncoder,
+}
+
+
+def chunks(rows):
+    iterator = rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return lambda: list(islice(iterator, EXPORT_CHUNK_SIZE))
+
+
+def stream(rows, encoder):
+    yield encoder.header()
+    next_chunk = chunks(rows)
+    while chunk := next_chunk():
+        yield encoder.encode(chunk)
+    yield encoder.footer()
+
+
+async def astream(rows, encoder):
+    """
+    `stream()` for ASGI, where a sync iterator would be read to the end before sending anything.
+    Each chunk is fetched on the sync thread that owns the database connection.
+    """
+    yield encoder.header()
+    next_chunk = sync_to_async(chunks(rows))
+    while chunk := await next_chunk():
+        yield encoder.encode(chunk)
+    yield encoder.footer()
@@ -0,0 +1,43 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders import payments
+from orders.models import PaymentTest
+
+
+class Command(BaseCommand):
+    help = (
+        "Authorize queued payments with the configured gateway. Run one or more of these "
+        "when PAYMENT_QUEUE=worker; each process authorizes up to --threads payments at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent gateway calls per process.")
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--requeue-after", type=int, default=settings.PAYMENT_REQUEUE_AFTER,
+                            help="Requeue payments claimed more than this many seconds ago (crashed workers).")
+        parser.add_argument("--once", action="store_true", help="Drain the queue and exit.")
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options["threads"], thread_name_prefix="payments") as executor:
+            while True:
+                requeued = payments.requeue_stale(options["requeue_after"])
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale payments"))
+
+                queued = list(
+                    PaymentTest.objects.filter(status=PaymentTest.Status.QUEUED)
+                    .order_by("id")
+                    .values_list("id", flat=True)[: options["batch_size"]]
+                )
+                if queued:
+                    processed = sum(executor.map(payments.run_job, queued))
+                    self.stdout.write(f"Processed {processed} payments")
+                elif options["once"]:
+                    return
+                else:
+                    time.sleep(options["poll_interval"])
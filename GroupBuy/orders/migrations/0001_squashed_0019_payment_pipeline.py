@@ -0,0 +1,235 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:36
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ("orders", "0001_initial"),
+        ("orders", "0002_grouppurchase_order_group_purchase"),
+        ("orders", "0003_alter_order_total_price"),
+        ("orders", "0004_alter_grouppurchase_total_price_and_more"),
+        ("orders", "0005_remove_grouppurchase_participants_and_more"),
+        ("orders", "0006_remove_grouppurchase_participants_and_more"),
+        ("orders", "0007_remove_grouppurchase_participants_and_more"),
+        ("orders", "0008_grouppurchase_expiration_time"),
+        ("orders", "0009_alter_grouppurchase_expiration_time"),
+        ("orders", "0010_alter_grouppurchase_expiration_time"),
+        ("orders", "0011_alter_grouppurchase_expiration_time"),
+        ("orders", "0012_alter_grouppurchase_expiration_time"),
+        ("orders", "0013_alter_grouppurchase_expiration_time_paymenttest"),
+        ("orders", "0014_remove_grouppurchase_expiration_time"),
+        ("orders", "0015_grouppurchase_is_private"),
+        ("orders", "0016_order_user_created_idx"),
+        ("orders", "0017_order_unit_price"),
+        ("orders", "0018_payment_idempotency"),
+        ("orders", "0019_payment_pipeline"),
+    ]
+
+    initial = True
+
+    dependencies = [
+        ("products", "0006_review"),
+        ("products", "0008_remove_product_rating"),
+        ("products", "0021_product_brand"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GroupPurchase",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "total_price",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=10
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "participants",
+                    models.ManyToManyField(
+                        blank=True,
+                        related_name="group_purchases",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("is_private", models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Order",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField()),
+                ("total_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "order_type",
+                    models.CharField(
+                        choices=[("individual", "individual"), ("group", "group")],
+                        max_length=20,
+                    ),
+                ),
+                ("participants", models.PositiveIntegerField(default=1)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "group_purchase",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="orders.grouppurchase",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PaymentTest",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=250)),
+                ("email", models.EmailField(max_length=254)),
+                ("address", models.CharField(blank=True, max_length=250)),
+                ("postal_code", models.CharField(blank=True, max_length=10)),
+                ("phone_number", models.CharField(blank=True, max_length=20)),
+                ("city", models.CharField(blank=True, max_length=250)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "group_purchase",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="orders.grouppurchase",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="orders.order"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "created_at"], name="order_user_created_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="unit_price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="paymenttest",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="paymenttest",
+            name="failure_reason",
+            field=models.CharField(blank=True, max_length=250),
+        ),
+        migrations.AddField(
+            model_name="paymenttest",
+            name="gateway_reference",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name="paymenttest",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("queued", "queued"),
+                    ("processing", "processing"),
+                    ("authorized", "authorized"),
+                    ("failed", "failed"),
+                ],
+                db_index=True,
+                default="queued",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="payment_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "pending"),
+                    ("processing", "processing"),
+                    ("paid", "paid"),
+                    ("failed", "failed"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="paymenttest",
+            name="idempotency_key",
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
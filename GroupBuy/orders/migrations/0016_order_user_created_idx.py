@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0015_grouppurchase_is_private"),
+        ("products", "0021_product_brand"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["user", "created_at"], name="order_user_created_idx"),
+        ),
+    ]
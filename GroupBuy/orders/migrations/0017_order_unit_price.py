@@ -0,0 +1,30 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_unit_price(apps, schema_editor):
+    # Derive the snapshot from the stored total so historical revenue is preserved,
+    # rather than repricing old orders from the product's current price.
+    Order = apps.get_model("orders", "Order")
+    Order.objects.filter(unit_price__isnull=True, quantity__gt=0).update(
+        unit_price=F("total_price") / F("quantity")
+    )
+    Order.objects.filter(unit_price__isnull=True).update(unit_price=F("total_price"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0016_order_user_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="unit_price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, max_digits=10, null=True
+            ),
+        ),
+        migrations.RunPython(backfill_unit_price, migrations.RunPython.noop, elidable=True),
+    ]
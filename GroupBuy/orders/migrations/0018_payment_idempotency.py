@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:15
+
+from django.db import migrations, models
+
+
+def mark_paid_orders(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    Order.objects.filter(paymenttest__isnull=False).update(payment_status="paid")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0017_order_unit_price"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="payment_status",
+            field=models.CharField(
+                choices=[("pending", "pending"), ("paid", "paid")],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="paymenttest",
+            name="idempotency_key",
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(mark_paid_orders, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:16
+
+from django.db import migrations, models
+
+
+def mark_existing_payments_authorized(apps, schema_editor):
+    # Payments recorded before the pipeline existed were completed synchronously.
+    PaymentTest = apps.get_model("orders", "PaymentTest")
+    PaymentTest.objects.update(status="authorized")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0018_payment_idempotency"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paymenttest",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="paymenttest",
+            name="failure_reason",
+            field=models.CharField(blank=True, max_length=250),
+        ),
+        migrations.AddField(
+            model_name="paymenttest",
+            name="gateway_reference",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name="paymenttest",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("queued", "queued"),
+                    ("processing", "processing"),
+                    ("authorized", "authorized"),
+                    ("failed", "failed"),
+                ],
+                db_index=True,
+                default="queued",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="payment_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "pending"),
+                    ("processing", "processing"),
+                    ("paid", "paid"),
+                    ("failed", "failed"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(
+            mark_existing_payments_authorized,
+            migrations.RunPython.noop,
+            elidable=True,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0001_squashed_0019_payment_pipeline"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="grouppurchase",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
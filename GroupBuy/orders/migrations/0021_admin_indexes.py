@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0020_grouppurchase_updated_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="paymenttest",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="paymenttest",
+            name="gateway_reference",
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["created_at"], name="order_created_idx"),
+        ),
+    ]
@@ -1,7 +1,11 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Sum
 from products.models import Product
 from django.contrib.auth.models import User
 from decimal import Decimal
+from products import popularity
+from main import metrics
+from . import pricing
 
 
 class GroupPurchase(models.Model):
@@ -10,10 +14,11 @@ class GroupPurchase(models.Model):
     is_active = models.BooleanField(default=True)  
     is_private = models.BooleanField(default=False)
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # drives ETag/Last-Modified on group pages
 
     def calculate_total_price(self):
-        price_per_product = self.product.group_price if self.product.group_price else self.product.price
-        return self.participants.count() * price_per_product
+        participants = self.participants.count()
+        return participants * pricing.group_unit_price(self.product, participants)
 
     def add_participant(self, user):
         if self.is_active and user not in self.participants.all():
@@ -21,13 +26,28 @@ class GroupPurchase(models.Model):
             self.total_price = self.calculate_total_price()
             super().save()
 
+    def reprice_orders(self):
+        """
+        Move the group's unpaid orders to the tier for the group's current size,
+        so early joiners never pay more than later ones, and set `total_price`
+        to the sum of the orders. Called after each join, so unpaid orders carry
+        the final tier once the group closes. Orders whose payment is processing
+        or paid keep the price they were charged.
+        """
+        price = pricing.group_unit_price(self.product, self.participants.count())
+        unpaid = [Order.PaymentStatus.PENDING, Order.PaymentStatus.FAILED]
+        self.order_set.filter(payment_status__in=unpaid).update(unit_price=price, total_price=F('quantity') * price)
+        self.total_price = self.order_set.aggregate(total=Sum('total_price'))['total'] or Decimal('0.00')
+        super().save(update_fields=['total_price', 'updated_at'])
+
     def close_purchase(self):
         if self.participants.count() >= self.product.min_participants:
             self.is_active = False
             super().save()
 
     def __str__(self):
-        return f"Group purchase for {self.product.name}, {self.participants.count()} participants"
+        # No participant count here: admin lists and widgets call this once per row.
+        return f"Group purchase #{self.pk} for {self.product.name}"
 
 
 
@@ -36,32 +56,74 @@ class Order(models.Model):
       INDIVIDUAL = 'individual', 'individual'
       GROUP = 'group', 'group'
 
+    class PaymentStatus(models.TextChoices):
+      PENDING = 'pending', 'pending'
+      PROCESSING = 'processing', 'processing'
+      PAID = 'paid', 'paid'
+      FAILED = 'failed', 'failed'
+
+    # Allowed payment status changes: target status -> statuses it can be reached from.
+    PAYMENT_TRANSITIONS = {
+        PaymentStatus.PROCESSING: [PaymentStatus.PENDING, PaymentStatus.FAILED],
+        PaymentStatus.PAID: [PaymentStatus.PROCESSING],
+        PaymentStatus.FAILED: [PaymentStatus.PROCESSING],
+    }
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)  # price snapshot at order time
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
     order_type = models.CharField(max_length=20, choices=OrderType.choices)
     group_purchase = models.ForeignKey(GroupPurchase, on_delete=models.SET_NULL, null=True, blank=True)  # إضافة ارتباط بالشراء الجماعي
     participants = models.PositiveIntegerField(default=1)  
+    payment_status = models.CharField(max_length=20, choices=PaymentStatus.choices, default=PaymentStatus.PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='order_user_created_idx'),
+            models.Index(fields=['created_at'], name='order_created_idx'),
+        ]
 
-    def save(self, *args, **kwargs):
-        if self.order_type == self.OrderType.GROUP:
-            if self.product.group_price:
-                price = self.product.group_price
-            else:
-                price = self.product.price
 
-            self.total_price = self.quantity * price
+    def save(self, *args, **kwargs):
+        # The unit price is captured once; later saves reuse it instead of repricing from the product.
+        if self.unit_price is None:
+            pricing.resolve_unit_prices([self])
         else:
-            self.total_price = self.quantity * self.product.price
+            self.total_price = self.quantity * self.unit_price
 
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if adding:
+            event = "group_join" if self.order_type == self.OrderType.GROUP else "order"
+            popularity.record(self.product_id, event, self.quantity)
+            order_type = self.order_type
+            transaction.on_commit(lambda: metrics.ORDERS_CREATED.labels(order_type).inc())
+
+    def transition_payment(self, status):
+        """
+        Move the order to `status` if the transition is allowed from its current status.
+        Done as a single conditional UPDATE, so concurrent requests can't both win.
+        Returns True when this call changed the status.
+        """
+        changed = Order.objects.filter(
+            pk=self.pk, payment_status__in=self.PAYMENT_TRANSITIONS[status]
+        ).update(payment_status=status)
+        if changed:
+            self.payment_status = status
+        return bool(changed)
 
 
 
 class PaymentTest(models.Model):
+    class Status(models.TextChoices):
+      QUEUED = 'queued', 'queued'
+      PROCESSING = 'processing', 'processing'
+      AUTHORIZED = 'authorized', 'authorized'
+      FAILED = 'failed', 'failed'
+
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     name = models.CharField(max_length=250)
     order = models.ForeignKey('Order', on_delete=models.CASCADE)
@@ -71,7 +133,12 @@ class PaymentTest(models.Model):
     postal_code = models.CharField(max_length=10, blank=True)
     phone_number = models.CharField(max_length=20, blank=True)
     city = models.CharField(max_length=250, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True)  # one payment per checkout form
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED, db_index=True)
+    gateway_reference = models.CharField(max_length=100, blank=True, db_index=True)
+    failure_reason = models.CharField(max_length=250, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return f"Payment by {self.name} - {self.email}"
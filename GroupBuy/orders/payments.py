@@ -0,0 +1,192 @@
+"""
+Payment processing pipeline.
+
+Submitting the checkout form only records a queued `PaymentTest` and moves the
+order to `processing`; authorization with the gateway happens off the request
+path:
+
+- PAYMENT_QUEUE = "thread": jobs run on an in-process thread pool (default, no extra services).
+- PAYMENT_QUEUE = "worker": jobs stay queued in the database for `manage.py process_payments`.
+- PAYMENT_QUEUE = "inline": jobs run in the request after commit (handy for tests).
+
+Jobs are claimed with a conditional UPDATE, so any number of threads or worker
+processes can run side by side without authorizing a payment twice.
+
+A job can be lost with its process: a queued job waiting in a recycled
+worker's thread pool, or a claimed one whose worker was killed mid-call. In
+thread mode every web process therefore sweeps every PAYMENT_SWEEP_INTERVAL
+seconds, putting payments claimed more than PAYMENT_REQUEUE_AFTER seconds ago
+back in the queue and running queued ones that old itself. A requeued payment
+may already have been authorized by the gateway, so every authorization carries
+the payment's idempotency reference: the gateway returns the first result for
+a repeated reference instead of charging again.
+"""
+
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from main.periodic import PeriodicTask
+from .models import Order, PaymentTest
+
+
+class GatewayResult:
+    def __init__(self, approved, reference="", reason=""):
+        self.approved = approved
+        self.reference = reference
+        self.reason = reason
+
+
+class PaymentGateway:
+    """
+    Adapter interface for a payment provider.
+
+    `idempotency_key` is the same on every attempt for a payment; adapters must
+    pass it on (e.g. as the provider's Idempotency-Key header), so a retried
+    authorization returns the first result instead of charging twice.
+    """
+
+    def authorize(self, payment, idempotency_key):
+        raise NotImplementedError
+
+
+class MockGateway(PaymentGateway):
+    """
+    Local stand-in for a real provider. Sleeps for PAYMENT_MOCK_LATENCY seconds
+    (with +/-50% jitter) and declines PAYMENT_MOCK_FAILURE_RATE of requests.
+    Payments whose name contains "decline" are always declined. Results are
+    remembered per idempotency key, like a real provider.
+    """
+
+    def __init__(self, latency=None, failure_rate=None):
+        self.latency = settings.PAYMENT_MOCK_LATENCY if latency is None else latency
+        self.failure_rate = settings.PAYMENT_MOCK_FAILURE_RATE if failure_rate is None else failure_rate
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def authorize(self, payment, idempotency_key):
+        with self.lock:
+            if idempotency_key in self.results:
+                return self.results[idempotency_key]
+        time.sleep(self.latency * random.uniform(0.5, 1.5))
+        if "decline" in payment.name.lower() or random.random() < self.failure_rate:
+            result = GatewayResult(False, reason="Declined by mock gateway")
+        else:
+            result = GatewayResult(True, reference=f"mock_{uuid.uuid4().hex[:16]}")
+        with self.lock:
+            return self.results.setdefault(idempotency_key, result)
+
+
+def idempotency_key(payment):
+    """The reference sent with every authorization attempt for `payment`."""
+    return payment.idempotency_key or f"payment-{payment.pk}"
+
+
+_gateway = None
+_executor = None
+
+
+def get_gateway():
+    global _gateway
+    if _gateway is None:
+        _gateway = import_string(settings.PAYMENT_GATEWAY)()
+    return _gateway
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.PAYMENT_THREAD_WORKERS, thread_name_prefix="payments")
+    return _executor
+
+
+def enqueue(payment_id):
+    """Schedule authorization of a queued payment once the current transaction commits."""
+    if settings.PAYMENT_QUEUE == "thread":
+        sweeper.ensure_started()
+        transaction.on_commit(lambda: get_executor().submit(run_job, payment_id))
+    elif settings.PAYMENT_QUEUE == "inline":
+        transaction.on_commit(lambda: process_payment(payment_id))
+    # "worker": the row stays queued until process_payments picks it up.
+
+
+def run_job(payment_id):
+    """Thread-pool entry point; each job uses and releases its own DB connection."""
+    close_old_connections()
+    try:
+        return process_payment(payment_id)
+    finally:
+        close_old_connections()
+
+
+def claim(payment_id):
+    return PaymentTest.objects.filter(id=payment_id, status=PaymentTest.Status.QUEUED).update(
+        status=PaymentTest.Status.PROCESSING, claimed_at=timezone.now()
+    )
+
+
+def process_payment(payment_id):
+    """Authorize one payment and settle its order. Returns False if another worker owns it."""
+    if not claim(payment_id):
+        return False
+
+    payment = PaymentTest.objects.select_related("order").get(id=payment_id)
+    try:
+        result = get_gateway().authorize(payment, idempotency_key(payment))
+    except Exception as e:
+        result = GatewayResult(False, reason=f"Gateway error: {e}")
+
+    with transaction.atomic():
+        if result.approved:
+            payment.status = PaymentTest.Status.AUTHORIZED
+            payment.order.transition_payment(Order.PaymentStatus.PAID)
+        else:
+            payment.status = PaymentTest.Status.FAILED
+            payment.order.transition_payment(Order.PaymentStatus.FAILED)
+        payment.gateway_reference = result.reference
+        payment.failure_reason = result.reason[:250]
+        payment.save(update_fields=["status", "gateway_reference", "failure_reason"])
+    return True
+
+
+def requeue_stale(older_than):
+    """
+    Put payments claimed more than `older_than` seconds ago (e.g. by a crashed worker) back in the queue.
+    Safe even if the gateway already authorized them: the retry sends the same idempotency key.
+    """
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    return PaymentTest.objects.filter(status=PaymentTest.Status.PROCESSING, claimed_at__lt=cutoff).update(
+        status=PaymentTest.Status.QUEUED
+    )
+
+
+def sweep():
+    """Requeue stale claims and run payments queued more than PAYMENT_REQUEUE_AFTER seconds ago on this process's pool."""
+    older_than = settings.PAYMENT_REQUEUE_AFTER
+    requeue_stale(older_than)
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    orphaned = list(
+        PaymentTest.objects.filter(status=PaymentTest.Status.QUEUED, created_at__lt=cutoff)
+        .order_by("id")
+        .values_list("id", flat=True)[:100]
+    )
+    for payment_id in orphaned:
+        get_executor().submit(run_job, payment_id)
+    return orphaned
+
+
+sweeper = PeriodicTask("payments-sweep", sweep, lambda: settings.PAYMENT_SWEEP_INTERVAL)
+
+
+def start_sweeper(sender, **kwargs):
+    """request_started receiver: thread mode has no process_payments loop, so each web process sweeps."""
+    if settings.PAYMENT_QUEUE == "thread":
+        sweeper.ensure_started()
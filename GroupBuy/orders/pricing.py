@@ -0,0 +1,100 @@
+"""
+Order pricing.
+
+An order keeps the unit price it was placed at (`Order.unit_price`), so later
+saves, bulk inserts and revenue reports never depend on the product's current
+price.
+
+Group purchases are priced from the product's `PriceTier` rows: the tier with
+the highest `min_participants` not above the group's size applies, falling back
+to `group_price` (or `price`) below the first tier. Tiers are loaded for many
+products in one query and kept as sorted threshold/price arrays, so pricing a
+whole listing is a bisect per group.
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+
+from products.models import PriceTier, Product
+
+
+def unit_price(price, group_price, is_group):
+    """Group orders pay the group price when the product has one."""
+    if is_group and group_price:
+        return group_price
+    return price
+
+
+def resolve_unit_prices(orders):
+    """
+    Fill `unit_price` and `total_price` on orders that have no price snapshot yet.
+    Products already loaded on an order are reused; the rest are fetched in one query.
+    """
+    pending = [order for order in orders if order.unit_price is None]
+    missing_ids = {order.product_id for order in pending if not order._meta.get_field('product').is_cached(order)}
+    prices = {
+        row['id']: (row['price'], row['group_price'])
+        for row in Product.objects.filter(id__in=missing_ids).values('id', 'price', 'group_price')
+    } if missing_ids else {}
+
+    for order in pending:
+        if order.product_id in prices:
+            price, group_price = prices[order.product_id]
+        else:
+            price, group_price = order.product.price, order.product.group_price
+        order.unit_price = unit_price(price, group_price, order.order_type == order.OrderType.GROUP)
+        order.total_price = order.quantity * order.unit_price
+    return orders
+
+
+def load_tiers(product_ids):
+    """Map product id -> (thresholds, prices), both sorted by threshold."""
+    tiers = defaultdict(lambda: ([], []))
+    rows = (
+        PriceTier.objects.filter(product_id__in=product_ids)
+        .order_by('product_id', 'min_participants')
+        .values_list('product_id', 'min_participants', 'price')
+    )
+    for product_id, threshold, price in rows:
+        thresholds, prices = tiers[product_id]
+        thresholds.append(threshold)
+        prices.append(price)
+    return tiers
+
+
+def tier_price(tiers, product, participants):
+    """Per-participant price for a group of `participants` people."""
+    thresholds, prices = tiers.get(product.id, ((), ()))
+    index = bisect_right(thresholds, participants) - 1
+    if index >= 0:
+        return prices[index]
+    return unit_price(product.price, product.group_price, True)
+
+
+def next_tier(tiers, product, participants):
+    """(threshold, price) of the next cheaper tier, or None when the group is on the last one."""
+    thresholds, prices = tiers.get(product.id, ((), ()))
+    index = bisect_right(thresholds, participants)
+    if index < len(thresholds):
+        return thresholds[index], prices[index]
+    return None
+
+
+def group_unit_price(product, participants):
+    return tier_price(load_tiers([product.id]), product, participants)
+
+
+def price_groups(groups):
+    """
+    Set `current_price`, `next_tier_at` and `next_tier_price` on each group purchase.
+    Groups should come with `product` selected and a `participant_count` annotation;
+    tiers for all of them are fetched in a single query.
+    """
+    groups = list(groups)
+    tiers = load_tiers({group.product_id for group in groups})
+    for group in groups:
+        count = group.participant_count if hasattr(group, 'participant_count') else group.participants.count()
+        group.current_price = tier_price(tiers, group.product, count)
+        upcoming = next_tier(tiers, group.product, count)
+        group.next_tier_at, group.next_tier_price = upcoming if upcoming else (None, None)
+    return groups
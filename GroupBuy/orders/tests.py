@@ -1,3 +1,327 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile_Seller, Profile_User
+from main import request_profiler
+from products.models import PriceTier, Product
+from . import payments, pricing
+from .models import GroupPurchase, Order, PaymentTest
+
+
+def create_product(seller, **fields):
+    values = {
+        'seller': seller, 'name': 'Kettle', 'price': Decimal('100.00'), 'group_price': Decimal('80.00'),
+        'min_participants': 2, 'max_participants': 3, 'description': 'A kettle', 'category': 'Electronics',
+        'brand': 'Acme', 'colour': 'Black', 'size': 'M', 'quantity': 10,
+    }
+    values.update(fields)
+    return Product.objects.create(**values)
+
+
+def create_buyer(username):
+    user = User.objects.create_user(username, f'{username}@example.com', 'pass-1234')
+    Profile_User.objects.create(user=user)
+    return user
+
+
+class GroupTierPricingTest(TestCase):
+    def setUp(self):
+        self.product = create_product(User.objects.create_user('seller', password='pass-1234'))
+        PriceTier.objects.create(product=self.product, min_participants=2, price=Decimal('70.00'))
+        PriceTier.objects.create(product=self.product, min_participants=3, price=Decimal('60.00'))
+        self.group = GroupPurchase.objects.create(product=self.product)
+
+    def join(self, username):
+        self.client.force_login(create_buyer(username))
+        return self.client.post(reverse('orders:join_group_purchase', args=[self.group.id]))
+
+    def test_every_order_moves_to_the_final_tier(self):
+        for username in ('ann', 'bob', 'cat'):
+            self.join(username)
+
+        orders = Order.objects.filter(group_purchase=self.group)
+        self.assertEqual(sorted(orders.values_list('unit_price', flat=True)), [Decimal('60.00')] * 3)
+        self.assertEqual(sorted(orders.values_list('total_price', flat=True)), [Decimal('60.00')] * 3)
+        self.group.refresh_from_db()
+        self.assertFalse(self.group.is_active)
+        self.assertEqual(self.group.total_price, Decimal('180.00'))
+
+    def test_total_price_matches_the_orders_while_the_group_fills(self):
+        self.join('ann')
+        self.join('bob')
+
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.total_price, Decimal('140.00'))
+        self.assertEqual(
+            list(Order.objects.filter(group_purchase=self.group).values_list('unit_price', flat=True)),
+            [Decimal('70.00')] * 2,
+        )
+
+
+    def test_orders_already_paid_keep_their_price(self):
+        self.join('ann')
+        paid = Order.objects.get(group_purchase=self.group)
+        self.assertTrue(paid.transition_payment(Order.PaymentStatus.PROCESSING))
+        self.assertTrue(paid.transition_payment(Order.PaymentStatus.PAID))
+        self.join('bob')
+
+        paid.refresh_from_db()
+        self.assertEqual((paid.unit_price, paid.total_price), (Decimal('80.00'), Decimal('80.00')))
+        later = Order.objects.filter(group_purchase=self.group).exclude(id=paid.id).get()
+        self.assertEqual(later.unit_price, Decimal('70.00'))
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.total_price, Decimal('150.00'))
+
+class OrderPriceSnapshotTest(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user('seller', password='pass-1234')
+        self.buyer = create_buyer('ann')
+        self.product = create_product(self.seller)
+
+    def test_later_saves_keep_the_price_the_order_was_placed_at(self):
+        individual = Order.objects.create(user=self.buyer, product=self.product, quantity=2, order_type=Order.OrderType.INDIVIDUAL)
+        group = Order.objects.create(user=self.buyer, product=self.product, quantity=1, order_type=Order.OrderType.GROUP)
+
+        Product.objects.filter(id=self.product.id).update(price=Decimal('150.00'), group_price=Decimal('120.00'))
+        PriceTier.objects.create(product=self.product, min_participants=1, price=Decimal('50.00'))
+        for order in (individual, group):
+            order = Order.objects.get(id=order.id)
+            order.quantity += 1
+            order.save()
+
+        individual.refresh_from_db()
+        group.refresh_from_db()
+        self.assertEqual((individual.unit_price, individual.total_price), (Decimal('100.00'), Decimal('300.00')))
+        self.assertEqual((group.unit_price, group.total_price), (Decimal('80.00'), Decimal('160.00')))
+
+    def test_bulk_resolve_reads_all_products_in_one_query(self):
+        products = [create_product(self.seller, name=f'Kettle {i}', price=Decimal(10 + i)) for i in range(5)]
+        orders = [
+            Order(user=self.buyer, product_id=product.id, quantity=2, order_type=Order.OrderType.INDIVIDUAL)
+            for product in products
+        ]
+
+        with self.assertNumQueries(1):
+            pricing.resolve_unit_prices(orders)
+        self.assertEqual([order.total_price for order in orders], [Decimal(2 * (10 + i)) for i in range(5)])
+
+    def test_pricing_many_groups_reads_tiers_in_one_query(self):
+        products = [create_product(self.seller, name=f'Kettle {i}') for i in range(5)]
+        for product in products[:3]:
+            PriceTier.objects.create(product=product, min_participants=1, price=Decimal('60.00'))
+        for product in products:
+            GroupPurchase.objects.create(product=product).participants.add(self.buyer)
+        groups = GroupPurchase.objects.select_related('product').annotate(participant_count=Count('participants'))
+        groups = list(groups.order_by('id'))
+
+        with self.assertNumQueries(1):
+            pricing.price_groups(groups)
+        self.assertEqual([group.current_price for group in groups], [Decimal('60.00')] * 3 + [Decimal('80.00')] * 2)
+
+
+class UserOrdersViewTest(TestCase):
+    def setUp(self):
+        seller = User.objects.create_user('seller', password='pass-1234')
+        self.buyer = create_buyer('ann')
+        self.kettle = create_product(seller)
+        self.toaster = create_product(seller, name='Toaster')
+        self.start = timezone.now() - timedelta(days=10)
+        self.order(self.kettle, Order.OrderType.INDIVIDUAL, days=0)
+        self.order(self.kettle, Order.OrderType.INDIVIDUAL, days=3)
+        self.order(self.kettle, Order.OrderType.GROUP, days=1)
+        self.order(self.toaster, Order.OrderType.INDIVIDUAL, days=2)
+        self.order(self.toaster, Order.OrderType.INDIVIDUAL, days=5, user=create_buyer('bob'))
+        self.client.force_login(self.buyer)
+        # Re-read the profiling switch on the next request so query counts don't depend on test order.
+        request_profiler._switch['checked'] = None
+
+    def order(self, product, order_type, days, user=None):
+        order = Order.objects.create(user=user or self.buyer, product=product, quantity=1, order_type=order_type)
+        Order.objects.filter(id=order.id).update(created_at=self.start + timedelta(days=days))
+
+    def rows(self, response):
+        return [
+            (item['product'].name, item['order_type'], item['count'], item['last_created'])
+            for item in response.context['orders_grouped']
+        ]
+
+    def test_orders_are_grouped_by_product_and_type_newest_first(self):
+        # Profiling switch, session, user, page count, grouped page, products, and the header's two profiles.
+        with self.assertNumQueries(8):
+            response = self.client.get(reverse('orders:user_orders_view'))
+
+        self.assertEqual(self.rows(response), [
+            ('Kettle', Order.OrderType.INDIVIDUAL, 2, self.start + timedelta(days=3)),
+            ('Toaster', Order.OrderType.INDIVIDUAL, 1, self.start + timedelta(days=2)),
+            ('Kettle', Order.OrderType.GROUP, 1, self.start + timedelta(days=1)),
+        ])
+
+    @mock.patch('orders.views.ORDERS_PER_PAGE', 2)
+    def test_second_page_holds_the_remaining_groups(self):
+        with self.assertNumQueries(8):
+            response = self.client.get(reverse('orders:user_orders_view'), {'page': 2})
+
+        self.assertEqual(response.context['page_obj'].number, 2)
+        self.assertEqual(response.context['page_obj'].paginator.num_pages, 2)
+        self.assertEqual(self.rows(response), [('Kettle', Order.OrderType.GROUP, 1, self.start + timedelta(days=1))])
+
+
+@override_settings(PAYMENT_QUEUE='worker')
+class IdempotentPaymentTest(TestCase):
+    def setUp(self):
+        self.buyer = create_buyer('ann')
+        product = create_product(User.objects.create_user('seller', password='pass-1234'))
+        self.order = Order.objects.create(user=self.buyer, product=product, quantity=1, order_type=Order.OrderType.INDIVIDUAL)
+        self.client.force_login(self.buyer)
+
+    def pay(self, key):
+        return self.client.post(reverse('orders:test_payment_view', args=[self.order.id]), {
+            'name': 'Ann', 'email': 'ann@example.com', 'idempotency_key': key,
+        })
+
+    def test_duplicate_post_records_one_payment(self):
+        first = self.pay('key-1')
+        second = self.pay('key-1')
+
+        self.assertRedirects(first, reverse('orders:order_detail', args=[self.order.id]), fetch_redirect_response=False)
+        self.assertRedirects(second, reverse('orders:order_detail', args=[self.order.id]), fetch_redirect_response=False)
+        self.assertEqual(PaymentTest.objects.filter(order=self.order).count(), 1)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.payment_status, Order.PaymentStatus.PROCESSING)
+
+    def test_reused_key_after_a_failed_payment_is_not_recorded_again(self):
+        self.pay('key-1')
+        Order.objects.filter(id=self.order.id).update(payment_status=Order.PaymentStatus.FAILED)
+
+        self.pay('key-1')
+        self.assertEqual(PaymentTest.objects.filter(order=self.order).count(), 1)
+        self.pay('key-2')
+        self.assertEqual(PaymentTest.objects.filter(order=self.order).count(), 2)
+
+
+class PaymentStatusTransitionTest(TestCase):
+    def setUp(self):
+        product = create_product(User.objects.create_user('seller', password='pass-1234'))
+        self.order = Order.objects.create(
+            user=create_buyer('ann'), product=product, quantity=1, order_type=Order.OrderType.INDIVIDUAL,
+        )
+
+    def test_allowed_path(self):
+        self.assertTrue(self.order.transition_payment(Order.PaymentStatus.PROCESSING))
+        self.assertTrue(self.order.transition_payment(Order.PaymentStatus.FAILED))
+        self.assertTrue(self.order.transition_payment(Order.PaymentStatus.PROCESSING))
+        self.assertTrue(self.order.transition_payment(Order.PaymentStatus.PAID))
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.payment_status, Order.PaymentStatus.PAID)
+
+    def test_rejected_transitions_leave_the_status(self):
+        self.assertFalse(self.order.transition_payment(Order.PaymentStatus.PAID))
+        self.order.transition_payment(Order.PaymentStatus.PROCESSING)
+        self.assertFalse(self.order.transition_payment(Order.PaymentStatus.PROCESSING))
+        self.order.transition_payment(Order.PaymentStatus.PAID)
+        self.assertFalse(self.order.transition_payment(Order.PaymentStatus.FAILED))
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.payment_status, Order.PaymentStatus.PAID)
+
+    def test_mark_paid_orders_backfill(self):
+        product = self.order.product
+        unpaid = Order.objects.create(user=self.order.user, product=product, quantity=1, order_type=Order.OrderType.INDIVIDUAL)
+        PaymentTest.objects.create(name='Ann', email='ann@example.com', order=self.order)
+
+        import_module('orders.migrations.0018_payment_idempotency').mark_paid_orders(apps, None)
+
+        self.order.refresh_from_db()
+        unpaid.refresh_from_db()
+        self.assertEqual(self.order.payment_status, Order.PaymentStatus.PAID)
+        self.assertEqual(unpaid.payment_status, Order.PaymentStatus.PENDING)
+
+
+class RecordingGateway(payments.PaymentGateway):
+    def __init__(self):
+        self.keys = []
+
+    def authorize(self, payment, idempotency_key):
+        self.keys.append(idempotency_key)
+        return payments.GatewayResult(True, reference='ref-1')
+
+
+@override_settings(PAYMENT_QUEUE='worker', PAYMENT_REQUEUE_AFTER=300)
+class PaymentSweepTest(TestCase):
+    def setUp(self):
+        product = create_product(User.objects.create_user('seller', password='pass-1234'))
+        self.order = Order.objects.create(
+            user=create_buyer('ann'), product=product, quantity=1, order_type=Order.OrderType.INDIVIDUAL,
+            payment_status=Order.PaymentStatus.PROCESSING,
+        )
+
+    def create_payment(self, age, **fields):
+        payment = PaymentTest.objects.create(name='Ann', email='ann@example.com', order=self.order, **fields)
+        PaymentTest.objects.filter(id=payment.id).update(created_at=timezone.now() - timedelta(seconds=age))
+        return payment
+
+    def test_sweep_runs_orphaned_and_stale_payments_only(self):
+        orphaned = self.create_payment(600)
+        stale = self.create_payment(
+            600, status=PaymentTest.Status.PROCESSING, claimed_at=timezone.now() - timedelta(seconds=600),
+        )
+        self.create_payment(10)
+        self.create_payment(600, status=PaymentTest.Status.PROCESSING, claimed_at=timezone.now())
+
+        with mock.patch.object(payments, 'get_executor') as get_executor:
+            swept = payments.sweep()
+
+        self.assertEqual(swept, [orphaned.id, stale.id])
+        get_executor.return_value.submit.assert_has_calls([
+            mock.call(payments.run_job, orphaned.id), mock.call(payments.run_job, stale.id),
+        ])
+
+    def test_retried_authorization_reuses_the_idempotency_key(self):
+        payment = self.create_payment(0, idempotency_key='key-1')
+        gateway = RecordingGateway()
+        with mock.patch.object(payments, '_gateway', gateway):
+            payments.process_payment(payment.id)
+            # The worker died before its result was saved; the sweep requeues the payment.
+            PaymentTest.objects.filter(id=payment.id).update(status=PaymentTest.Status.QUEUED)
+            Order.objects.filter(id=self.order.id).update(payment_status=Order.PaymentStatus.PROCESSING)
+            payments.process_payment(payment.id)
+
+        self.assertEqual(gateway.keys, ['key-1', 'key-1'])
+
+    def test_mock_gateway_returns_the_first_result_for_a_repeated_key(self):
+        gateway = payments.MockGateway(latency=0, failure_rate=0)
+        payment = self.create_payment(0)
+
+        first = gateway.authorize(payment, payments.idempotency_key(payment))
+        second = gateway.authorize(payment, payments.idempotency_key(payment))
+        self.assertIs(first, second)
+        self.assertEqual(payments.idempotency_key(payment), f'payment-{payment.id}')
+
+
+class SellerExportTest(TestCase):
+    def setUp(self):
+        seller = User.objects.create_user('seller', password='pass-1234')
+        Profile_Seller.objects.create(user=seller, CR='123')
+        self.client.force_login(seller)
+
+    def export(self, **query):
+        return self.client.get(reverse('orders:seller_export_view'), query)
+
+    def test_malformed_and_impossible_dates_get_400(self):
+        for value in ('yesterday', '2026-02-30', '2026-13-01'):
+            with self.subTest(value=value):
+                self.assertEqual(self.export(start=value).status_code, 400)
+                self.assertEqual(self.export(end=value).status_code, 400)
+
+    def test_valid_range_streams_csv(self):
+        response = self.export(start='2026-01-01', end='2026-02-28')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'order_id,'))
@@ -1,4 +1,5 @@
 from django.urls import path
+from django.conf import settings
 from .import views
 
 app_name = 'orders'
@@ -10,7 +11,9 @@ urlpatterns = [
      path('join-group-purchase/<int:group_purchase_id>/', views.join_group_purchase, name='join_group_purchase'),
      path('order-detail/<int:order_id>/', views.order_detail, name='order_detail'),
      path('my-orders/', views.user_orders_view, name='user_orders_view'),
-     path('group-purchases/', views.group_purchase_all, name='group_purchase_all'),
+     path('group-purchases/', views.async_group_purchase_all if settings.ASYNC_READ_VIEWS else views.group_purchase_all, name='group_purchase_all'),
      path('existing/group/<int:product_id>/', views.existing_group_choices, name='existing_group_choices'),
-     path('test/payment/<int:order_id>/', views.test_payment_view, name='test_payment_view')
+     path('test/payment/<int:order_id>/', views.test_payment_view, name='test_payment_view'),
+     path('order/<int:order_id>/payment-status/', views.payment_status_view, name='payment_status_view'),
+     path('seller/export/', views.seller_export_view, name='seller_export_view'),
 ]
@@ -1,17 +1,43 @@
 
 from django.shortcuts import render, redirect, get_object_or_404, reverse
-from django.http import HttpRequest, HttpResponse, Http404
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest, Http404, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.dateparse import parse_date
 from django.contrib import messages
-from django.db import transaction
+from django.db import transaction, IntegrityError
 from django.core.cache import cache
-from .models import Product, GroupPurchase, Order
+from .models import Product, GroupPurchase, Order, PaymentTest
 from .forms import OrderForm, TestPaymentForm
+from . import exports, payments, pricing
 from accounts.models import Profile_User, Profile_Seller
 from django.core.mail import send_mail
 from decimal import Decimal
+import uuid
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Count, Max
-from collections import defaultdict
+from django.core.paginator import Paginator
+from asgiref.sync import sync_to_async
+from main.conditional import conditional_page
+from main import metrics
+
+
+ORDERS_PER_PAGE = 12
+
+
+def group_purchase_version(request, group_purchase_id):
+    """Version of a group room: the group (participants, status) and its product."""
+    versions = GroupPurchase.objects.filter(id=group_purchase_id).values_list('updated_at', 'product__updated_at').first()
+    if versions is None:
+        return None
+    return versions, max(versions)
+
+
+def group_listing_version(request):
+    """Version of the group list: any group or product change (prices come from products and tiers)."""
+    groups = GroupPurchase.objects.aggregate(count=Count('id'), updated_at=Max('updated_at'))
+    products = Product.objects.aggregate(updated_at=Max('updated_at'))
+    last_modified = max(filter(None, [groups['updated_at'], products['updated_at']]), default=None)
+    return (groups['count'], groups['updated_at'], products['updated_at']), last_modified
 
 
 def check_group_purchase_availability(group_purchase, product):
@@ -24,6 +50,7 @@ def check_group_purchase_availability(group_purchase, product):
     """
     cache_key = f"group_purchase_{group_purchase.id}_availability"
     is_available = cache.get(cache_key)
+    metrics.cache_lookup("group_availability", is_available is not None)
     
     if is_available is None:
         is_available = product.quantity > 0 and group_purchase.participants.count() < product.max_participants
@@ -219,23 +246,28 @@ def join_group_purchase(request, group_purchase_id):
                     user=request.user,
                     product=product,
                     group_purchase=group_purchase,
-                    quantity=1,  
-                    total_price=product.group_price if product.group_price else product.price,  
-
+                    quantity=1,
+                    order_type=Order.OrderType.GROUP,
+                    unit_price=pricing.group_unit_price(product, group_purchase.participants.count()),
                 )
+                # A bigger group can reach a cheaper tier; it applies to everyone who joined before.
+                group_purchase.reprice_orders()
+                transaction.on_commit(metrics.GROUP_JOINS.inc)
 
                 messages.success(request, "You have successfully joined the group purchase!", "alert-success")
 
             if group_purchase.participants.count() >= product.max_participants or product.quantity <= 0:
                 group_purchase.is_active = False
                 group_purchase.save()
+                metrics.GROUP_COMPLETIONS.inc()
 
                 subject = f"Group Purchase Completed: {product.name}"
                 message = f"The group purchase for '{product.name}' is now complete. Thank you for joining!"
                 from_email = 'noreply@yourwebsite.com'
                 recipient_list = [user.email for user in group_purchase.participants.all() if user.email]
 
-                send_mail(subject, message, from_email, recipient_list, fail_silently=False)
+                with metrics.counting_email("group_completed"):
+                    send_mail(subject, message, from_email, recipient_list, fail_silently=False)
 
             return redirect('orders:test_payment_view', order_id=order.id)
 
@@ -246,6 +278,7 @@ def join_group_purchase(request, group_purchase_id):
     return redirect('orders:group_purchase_detail', group_purchase_id=group_purchase.id)
 
 
+@conditional_page(group_purchase_version)
 def group_purchase_detail(request, group_purchase_id):
     """
     View for displaying the details of a group purchase room.
@@ -260,11 +293,11 @@ def group_purchase_detail(request, group_purchase_id):
           return redirect('main:home_view')
 
     group_purchase = GroupPurchase.objects.get(id=group_purchase_id)
-    group_purchase.save()
 
     return render(request, 'orders/group_purchase_detail.html', {'group_purchase': group_purchase})
 
 
+@conditional_page(group_listing_version)
 def group_purchase_all(request):
     """
     View for displaying a list of all active, public group purchase rooms.
@@ -278,11 +311,43 @@ def group_purchase_all(request):
           messages.error(request, "Only User can order for group.", "alert-danger")
           return redirect('main:home_view')
 
-    group_purchases = GroupPurchase.objects.select_related('product').filter(is_private=False).order_by('-id')
+    group_purchases = (
+        GroupPurchase.objects.select_related('product')
+        .filter(is_private=False)
+        .annotate(participant_count=Count('participants'))
+        .order_by('-id')
+    )
+    group_purchases = pricing.price_groups(group_purchases)
     return render(request, 'orders/group_purchase_all.html', {'group_purchases': group_purchases})
 
 
 
+@conditional_page(group_listing_version)
+async def async_group_purchase_all(request):
+    """
+    Async version of group_purchase_all, used when settings.ASYNC_READ_VIEWS is on.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        messages.error(request, "You must be logged view all group.", "alert-danger")
+        return redirect("accounts:sign_in")
+
+    if not await Profile_User.objects.filter(user=user).aexists():
+          messages.error(request, "Only User can order for group.", "alert-danger")
+          return redirect('main:home_view')
+
+    group_purchases = (
+        GroupPurchase.objects.select_related('product')
+        .filter(is_private=False)
+        .annotate(participant_count=Count('participants'))
+        .order_by('-id')
+    )
+    group_purchases = [group async for group in group_purchases]
+    group_purchases = await sync_to_async(pricing.price_groups)(group_purchases)
+    return await sync_to_async(render)(request, 'orders/group_purchase_all.html', {'group_purchases': group_purchases})
+
+
+
 def existing_group_choices(request, product_id):
     """
     Displays available group purchase rooms for a specific product.
@@ -323,32 +388,37 @@ def order_detail(request, order_id):
 def user_orders_view(request):
     """
     View for displaying all orders placed by the authenticated user.
-    Orders are grouped by product, and the most recent order is shown for each product.
+    Orders are grouped by product and order type in the database, with the
+    number of orders and the date of the most recent one, and paginated.
     """
 
     try:
         if not request.user.is_authenticated:
             messages.error(request, 'Please login to access this page.', 'alert-danger')
-            return redirect('accounts:login')
-
-        orders = Order.objects.filter(user=request.user).select_related('product')
-
-        grouped_orders = defaultdict(lambda: defaultdict(list))
-        for order in orders:
-            grouped_orders[order.product][order.order_type].append(order)
-
-        product_orders = []
-        for product, order_types in grouped_orders.items():
-            for order_type, orders_list in order_types.items():
-                product_orders.append({
-                    'product': product,
-                    'order_type': order_type,  
-                    'count': len(orders_list),
-                    'last_order': sorted(orders_list, key=lambda x: x.created_at)[-1],
-                })
+            return redirect('accounts:sign_in')
+
+        grouped = (
+            Order.objects.filter(user=request.user)
+            .values('product_id', 'order_type')
+            .annotate(count=Count('id'), last_created=Max('created_at'))
+            .order_by('-last_created', 'product_id', 'order_type')
+        )
+        page = Paginator(grouped, ORDERS_PER_PAGE).get_page(request.GET.get('page'))
+
+        products = Product.objects.in_bulk({row['product_id'] for row in page})
+        product_orders = [
+            {
+                'product': products[row['product_id']],
+                'order_type': row['order_type'],
+                'count': row['count'],
+                'last_created': row['last_created'],
+            }
+            for row in page
+        ]
 
         return render(request, 'orders/user_orders.html', {
             'orders_grouped': product_orders,
+            'page_obj': page,
         })
 
     except Exception as e:
@@ -359,8 +429,11 @@ def user_orders_view(request):
 
 def test_payment_view(request, order_id):
     """
-    View for processing a test payment for an order.
-    If the order is part of a group purchase, it handles the payment for the group.
+    View for submitting a test payment for an order (individual or group).
+    The payment is queued and authorized in the background (see orders/payments.py);
+    the order page then shows its status while it is processing.
+    Every checkout form carries an idempotency key, so a repeated submission
+    (double click, retry) replays the first result instead of paying twice.
     """
 
     try:
@@ -375,56 +448,96 @@ def test_payment_view(request, order_id):
     
     group_purchase = order.group_purchase  
     product = order.product
-    quantity = order.quantity
-
-    if group_purchase:
-        total_price = product.group_price if product.group_price else product.price
-        total_price *= quantity
-
-        if request.method == 'POST':
-            form = TestPaymentForm(request.POST)
-            if form.is_valid():
-                test_payment = form.save(commit=False)
-                test_payment.user = request.user if request.user.is_authenticated else None
-                test_payment.order = order
-                test_payment.group_purchase = group_purchase  
-                test_payment.save()
-                messages.success(request, "Thank you! This was a test payment experience. ✅", "alert-success")
-                return redirect('orders:group_purchase_detail', group_purchase_id=group_purchase.id)
+    total_price = order.total_price
 
-        else:
-            form = TestPaymentForm()
-
-        return render(request, 'orders/test_payment.html', {
-            'form': form,
-            'order': order,
-            'product': product,
-            'group_purchase': group_purchase,
-            'total_price': total_price,  
-        })
-    
-    else:
-        total_price = product.price * quantity
-
-        if request.method == 'POST':
-            form = TestPaymentForm(request.POST)
-            if form.is_valid():
-                test_payment = form.save(commit=False)
-                test_payment.user = request.user if request.user.is_authenticated else None
-                test_payment.order = order
-                test_payment.save()
-                messages.success(request, "Thank you! This was a test payment experience. ✅", "alert-success")
+    idempotency_key = request.POST.get('idempotency_key') or uuid.uuid4().hex
+    submitted_statuses = [Order.PaymentStatus.PROCESSING, Order.PaymentStatus.PAID]
+
+    if request.method == 'POST':
+        if order.payment_status in submitted_statuses or PaymentTest.objects.filter(idempotency_key=idempotency_key).exists():
+            messages.info(request, "Your payment was already received.", "alert-info")
+            return redirect('orders:order_detail', order_id=order.id)
+
+        form = TestPaymentForm(request.POST)
+        if form.is_valid():
+            test_payment = form.save(commit=False)
+            test_payment.user = request.user if request.user.is_authenticated else None
+            test_payment.order = order
+            test_payment.group_purchase = group_purchase
+            test_payment.idempotency_key = idempotency_key
+            try:
+                with transaction.atomic():
+                    # Only the request that moves the order to processing records the payment.
+                    if not order.transition_payment(Order.PaymentStatus.PROCESSING):
+                        messages.info(request, "Your payment was already received.", "alert-info")
+                        return redirect('orders:order_detail', order_id=order.id)
+                    test_payment.save()
+                    payments.enqueue(test_payment.id)
+            except IntegrityError:
+                # The same key was submitted concurrently and the other request won.
+                messages.info(request, "Your payment was already received.", "alert-info")
                 return redirect('orders:order_detail', order_id=order.id)
 
-        else:
-            form = TestPaymentForm()
+            messages.success(request, "Thank you! Your test payment is being processed. ✅", "alert-success")
+            return redirect('orders:order_detail', order_id=order.id)
 
-        return render(request, 'orders/test_payment.html', {
-            'form': form,
-            'order': order,
-            'product': product,
-            'total_price': total_price  
-        })
+    else:
+        form = TestPaymentForm()
+
+    return render(request, 'orders/test_payment.html', {
+        'form': form,
+        'order': order,
+        'product': product,
+        'group_purchase': group_purchase,
+        'total_price': total_price,
+        'idempotency_key': idempotency_key,
+    })
+
+
+def payment_status_view(request, order_id):
+    """
+    JSON payment status of one of the user's orders, polled by the order page.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'authentication required'}, status=401)
 
+    order = get_object_or_404(Order.objects.only('id', 'user_id', 'payment_status'), id=order_id, user=request.user)
+    return JsonResponse({'order_id': order.id, 'payment_status': order.payment_status})
 
 
+def seller_export_view(request):
+    """
+    Stream the seller's orders (?type=orders) or group purchases (?type=group_purchases)
+    as CSV (?format=csv) or JSON (?format=json), optionally limited to ?start= / ?end= dates (YYYY-MM-DD).
+    """
+    if not request.user.is_authenticated:
+        messages.error(request, "You must be logged in to export orders.", "alert-danger")
+        return redirect('accounts:sign_in')
+    if not Profile_Seller.objects.filter(user=request.user).exists():
+        messages.error(request, "Sorry, this page is for sellers only.", "alert-danger")
+        return redirect('main:home_view')
+
+    kind = request.GET.get('type', 'orders')
+    file_format = request.GET.get('format', 'csv')
+    if kind not in exports.EXPORTS or file_format not in exports.ENCODERS:
+        return HttpResponseBadRequest("Unknown export type or format.")
+    dates = {}
+    for name in ('start', 'end'):
+        if request.GET.get(name):
+            try:
+                # None for a malformed value; ValueError for a well-formed but impossible one (2026-02-30).
+                dates[name] = parse_date(request.GET[name])
+            except ValueError:
+                dates[name] = None
+            if dates[name] is None:
+                return HttpResponseBadRequest(f"{name} must be a date (YYYY-MM-DD).")
+
+    columns, rows = exports.EXPORTS[kind](request.user, **dates)
+    encoder = exports.ENCODERS[file_format](columns)
+    stream = exports.astream if isinstance(request, ASGIRequest) else exports.stream
+    filename = "-".join([kind] + [str(date) for date in dates.values()])
+    return StreamingHttpResponse(
+        stream(rows, encoder),
+        content_type=encoder.content_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{file_format}"'},
+    )
@@ -1,7 +1,66 @@
 from django.contrib import admin
-from .models import Product, Review, Cart, CartItem
+from main.paginators import EstimatedCountPaginator
+from .models import Product, PriceTier, ProductImport, Review, Cart, CartItem
 # Register your models here.
-admin.site.register(Product)
-admin.site.register(Review)
-admin.site.register(Cart)
-admin.site.register(CartItem)
\ No newline at end of file
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+  list_display = ('id', 'name', 'seller', 'category', 'price', 'group_price', 'quantity', 'favorite_count', 'view_count', 'updated_at')
+  list_select_related = ('seller',)
+  list_filter = ('category',)
+  search_fields = ('=sku', '=seller__username')
+  search_help_text = "Exact SKU or seller username."
+  date_hierarchy = 'updated_at'
+  raw_id_fields = ('seller', 'favorited_by')
+  readonly_fields = ('popularity', 'favorite_count', 'view_count')
+  paginator = EstimatedCountPaginator
+  show_full_result_count = False
+
+
+@admin.register(PriceTier)
+class PriceTierAdmin(admin.ModelAdmin):
+  list_display = ('id', 'product', 'min_participants', 'price')
+  list_select_related = ('product',)
+  raw_id_fields = ('product',)
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+  list_display = ('id', 'product', 'user', 'rating', 'created_at')
+  list_select_related = ('product', 'user')
+  list_filter = ('rating',)
+  search_fields = ('=user__username',)
+  search_help_text = "Exact reviewer username."
+  date_hierarchy = 'created_at'
+  raw_id_fields = ('product', 'user')
+  paginator = EstimatedCountPaginator
+  show_full_result_count = False
+
+
+@admin.register(Cart)
+class CartAdmin(admin.ModelAdmin):
+  list_display = ('id', 'user')
+  list_select_related = ('user',)
+  search_fields = ('=user__username',)
+  raw_id_fields = ('user', 'items')
+  paginator = EstimatedCountPaginator
+  show_full_result_count = False
+
+
+@admin.register(CartItem)
+class CartItemAdmin(admin.ModelAdmin):
+  list_display = ('id', 'user', 'product', 'quantity')
+  list_select_related = ('user', 'product')
+  search_fields = ('=user__username',)
+  raw_id_fields = ('user', 'product')
+  paginator = EstimatedCountPaginator
+  show_full_result_count = False
+
+
+@admin.register(ProductImport)
+class ProductImportAdmin(admin.ModelAdmin):
+  list_display = ('id', 'seller', 'status', 'processed_rows', 'created_count', 'updated_count', 'error_count', 'created_at')
+  list_select_related = ('seller',)
+  list_filter = ('status',)
+  raw_id_fields = ('seller',)
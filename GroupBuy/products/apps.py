@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
 
 
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        from .models import Product, invalidate_product_pages
+        post_save.connect(invalidate_product_pages, sender=Product)
+        post_delete.connect(invalidate_product_pages, sender=Product)
+        from .imports import start_sweeper
+        request_started.connect(start_sweeper)
@@ -0,0 +1,46 @@
+"""
+Per-user favorite state for product listings.
+
+`favorite_ids(request)` loads the ids of the products the signed-in user has
+favorited with one query and keeps them on the request, so product grids mark
+hearts with a set lookup instead of a query per card, however many grids the
+page shows. Listing page versions include the same set, so a 304 never serves
+stale hearts. Nothing is cached across requests, so every worker sees a toggle
+at once whichever cache backend is configured.
+"""
+
+from .models import Product
+from . import popularity
+
+Favorite = Product.favorited_by.through
+
+
+def can_favorite(user):
+    """Only shoppers (users with a Profile_User) keep favorites."""
+    return user.is_authenticated and hasattr(user, "profile_user")
+
+
+def favorite_ids(request):
+    """Favorited product ids for the request's user, or None if they cannot favorite. Memoized per request."""
+    if not hasattr(request, "_favorite_ids"):
+        request._favorite_ids = None
+        if can_favorite(request.user):
+            request._favorite_ids = frozenset(
+                Favorite.objects.filter(user_id=request.user.pk).values_list("product_id", flat=True)
+            )
+    return request._favorite_ids
+
+
+def version(request):
+    """Changes whenever the user's favorites do; part of listing page versions."""
+    ids = favorite_ids(request)
+    return None if ids is None else tuple(sorted(ids))
+
+
+def toggle(user, product_id):
+    """Add or remove a favorite. Returns True if the product is now a favorite."""
+    removed, _ = Favorite.objects.filter(user_id=user.pk, product_id=product_id).delete()
+    if not removed:
+        Favorite.objects.get_or_create(user_id=user.pk, product_id=product_id)
+    popularity.record_favorite(product_id, added=not removed)
+    return not removed
@@ -1,5 +1,9 @@
+import zipfile
+
 from django import forms
-from products.models import Product
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
+from products.models import Product, ProductImport
 
 # Create the form class.
 class ProductForm(forms.ModelForm):
@@ -9,4 +13,50 @@ class ProductForm(forms.ModelForm):
 
         widgets = {
             'name' : forms.TextInput({"class" : "form-control"})
-        }
\ No newline at end of file
+        }
+
+class ProductImportRowForm(ProductForm):
+    """One CSV row of a bulk import: the ProductForm rules, with the image taken from the zip when given."""
+    class Meta(ProductForm.Meta):
+        exclude = ['seller', 'favorited_by']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['image'].required = False
+
+
+class ProductImportForm(forms.ModelForm):
+    class Meta:
+        model = ProductImport
+        fields = ['csv_file', 'images']
+
+        widgets = {
+            'csv_file': forms.ClearableFileInput({"class": "form-control", "accept": ".csv"}),
+            'images': forms.ClearableFileInput({"class": "form-control", "accept": ".zip"}),
+        }
+
+    def clean_csv_file(self):
+        csv_file = self.cleaned_data['csv_file']
+        if csv_file and csv_file.size > settings.PRODUCT_IMPORT_MAX_CSV_BYTES:
+            raise forms.ValidationError(f"The CSV file must be at most {filesizeformat(settings.PRODUCT_IMPORT_MAX_CSV_BYTES)}.")
+        return csv_file
+
+    def clean_images(self):
+        """Reject oversized or unreadable zips, and any image too big once unzipped (only the zip's index is read)."""
+        images = self.cleaned_data['images']
+        if not images:
+            return images
+        if images.size > settings.PRODUCT_IMPORT_MAX_ZIP_BYTES:
+            raise forms.ValidationError(f"The images zip must be at most {filesizeformat(settings.PRODUCT_IMPORT_MAX_ZIP_BYTES)}.")
+        try:
+            with zipfile.ZipFile(images) as archive:
+                too_big = [info.filename for info in archive.infolist() if info.file_size > settings.PRODUCT_IMPORT_MAX_IMAGE_BYTES]
+        except zipfile.BadZipFile:
+            raise forms.ValidationError("The images file is not a valid zip.")
+        finally:
+            images.seek(0)
+        if too_big:
+            raise forms.ValidationError(
+                f"Images must be at most {filesizeformat(settings.PRODUCT_IMPORT_MAX_IMAGE_BYTES)} unzipped: {', '.join(too_big[:5])}."
+            )
+        return images
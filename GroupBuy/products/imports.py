@@ -0,0 +1,219 @@
+"""
+Bulk product imports.
+
+A seller uploads a CSV with one product per row, using ProductForm field names
+as column headers, and optionally a zip of the images named in an `image`
+column. The upload view only stores the files and queues a `ProductImport`.
+The rows are imported off the request path, like payments (orders/payments.py):
+
+- PRODUCT_IMPORT_QUEUE = "thread": imports run on a background thread in the web process (default).
+- PRODUCT_IMPORT_QUEUE = "worker": imports stay queued for `manage.py process_imports`.
+- PRODUCT_IMPORT_QUEUE = "inline": imports run in the request after commit (handy for tests).
+
+The CSV is read as a stream, PRODUCT_IMPORT_BATCH_SIZE rows at a time. Each
+batch is validated with ProductForm's rules, then written with one bulk_create
+and one bulk_update in a transaction. That transaction also records the progress,
+so memory stays bounded by one batch and an interrupted import resumes after
+its last committed batch. A row whose `sku` matches one of the seller's products
+updates that product, and only the columns present in the file change. Other
+rows create new products. Invalid rows are skipped and reported with their line
+number.
+
+In thread mode every web process also sweeps every PRODUCT_IMPORT_SWEEP_INTERVAL
+seconds, so an import lost with a recycled worker is picked up again: stale
+claims go back in the queue (they resume after their last batch) and imports
+queued more than PRODUCT_IMPORT_REQUEUE_AFTER seconds ago run on the sweeping
+process.
+"""
+
+import codecs
+import csv
+import logging
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.forms.models import model_to_dict
+from django.utils import timezone
+
+from main import page_cache
+from main.periodic import PeriodicTask
+from .forms import ProductImportRowForm
+from .models import Product, ProductImport
+
+logger = logging.getLogger(__name__)
+
+ROW_FIELDS = list(ProductImportRowForm.base_fields)
+UPDATE_FIELDS = ROW_FIELDS + ['updated_at']
+ROW_DEFAULTS = {field.name: field.get_default() for field in Product._meta.fields if field.has_default()}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # One import at a time per process: imports are long and write-heavy.
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="product-imports")
+    return _executor
+
+
+def enqueue(import_id):
+    """Schedule a queued import once the current transaction commits."""
+    if settings.PRODUCT_IMPORT_QUEUE == "thread":
+        sweeper.ensure_started()
+        transaction.on_commit(lambda: get_executor().submit(run_job, import_id))
+    elif settings.PRODUCT_IMPORT_QUEUE == "inline":
+        transaction.on_commit(lambda: process_import(import_id))
+    # "worker": the import stays queued until process_imports picks it up.
+
+
+def run_job(import_id):
+    """Thread-pool entry point; each job uses and releases its own DB connection."""
+    close_old_connections()
+    try:
+        return process_import(import_id)
+    finally:
+        close_old_connections()
+
+
+def claim(import_id):
+    return ProductImport.objects.filter(id=import_id, status=ProductImport.Status.QUEUED).update(
+        status=ProductImport.Status.PROCESSING, claimed_at=timezone.now()
+    )
+
+
+def requeue_stale(older_than):
+    """Put imports with no committed batch for `older_than` seconds (e.g. a crashed worker) back in the queue."""
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    return ProductImport.objects.filter(status=ProductImport.Status.PROCESSING, claimed_at__lt=cutoff).update(
+        status=ProductImport.Status.QUEUED
+    )
+
+
+def sweep():
+    """Requeue stale claims and run imports queued more than PRODUCT_IMPORT_REQUEUE_AFTER seconds ago."""
+    older_than = settings.PRODUCT_IMPORT_REQUEUE_AFTER
+    requeue_stale(older_than)
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    orphaned = list(
+        ProductImport.objects.filter(status=ProductImport.Status.QUEUED, created_at__lt=cutoff)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    for import_id in orphaned:
+        get_executor().submit(run_job, import_id)
+    return orphaned
+
+
+sweeper = PeriodicTask("product-imports-sweep", sweep, lambda: settings.PRODUCT_IMPORT_SWEEP_INTERVAL)
+
+
+def start_sweeper(sender, **kwargs):
+    """request_started receiver: thread mode has no process_imports loop, so each web process sweeps."""
+    if settings.PRODUCT_IMPORT_QUEUE == "thread":
+        sweeper.ensure_started()
+
+
+def process_import(import_id):
+    """Import every remaining row of a queued import. Returns False if another worker owns it."""
+    if not claim(import_id):
+        return False
+
+    job = ProductImport.objects.get(id=import_id)
+    try:
+        with job.csv_file.open("rb") as csv_file, open_archive(job) as archive:
+            reader = csv.DictReader(codecs.iterdecode(csv_file, "utf-8-sig"))
+            rows = ((reader.line_num, row) for row in reader)
+            rows = islice(rows, job.processed_rows, None)
+            while batch := list(islice(rows, settings.PRODUCT_IMPORT_BATCH_SIZE)):
+                import_batch(job, batch, archive)
+    except Exception as e:
+        logger.exception("Product import %s failed", import_id)
+        ProductImport.objects.filter(id=import_id).update(
+            status=ProductImport.Status.FAILED, failure_reason=str(e)[:250], finished_at=timezone.now()
+        )
+        return True
+    ProductImport.objects.filter(id=import_id).update(status=ProductImport.Status.DONE, finished_at=timezone.now())
+    return True
+
+
+def open_archive(job):
+    return zipfile.ZipFile(job.images.open("rb")) if job.images else nullcontext()
+
+
+def validate_row(row, product, archive):
+    """Return a bound, validated ProductImportRowForm for a CSV row."""
+    row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+    data = model_to_dict(product, fields=ROW_FIELDS) if product else dict(ROW_DEFAULTS)
+    data.update(row)
+
+    files = {}
+    image = row.get("image")
+    if image:
+        info = archive.NameToInfo.get(image) if archive is not None else None
+        if info is None:
+            return image_error(data, product, f"{image} is not in the images zip.")
+        # The size in the zip's index bounds what reading the member can return, so check it before reading.
+        if info.file_size > settings.PRODUCT_IMPORT_MAX_IMAGE_BYTES:
+            return image_error(data, product, f"{image} is larger than {settings.PRODUCT_IMPORT_MAX_IMAGE_BYTES} bytes unzipped.")
+        files["image"] = SimpleUploadedFile(os.path.basename(image), archive.read(info))
+    return ProductImportRowForm(data=data, files=files, instance=product)
+
+
+def image_error(data, product, message):
+    form = ProductImportRowForm(data=data, instance=product)
+    form.is_valid()
+    form.add_error("image", message)
+    return form
+
+
+def import_batch(job, batch, archive):
+    skus = {(row.get("sku") or "").strip() for _, row in batch} - {""}
+    existing = {product.sku: product for product in Product.objects.filter(seller_id=job.seller_id, sku__in=skus)}
+    seen = {}
+    created, updated, errors = [], [], []
+    now = timezone.now()
+
+    for line, row in batch:
+        sku = (row.get("sku") or "").strip()
+        if sku in seen:
+            errors.append({"line": line, "sku": sku, "errors": {"sku": [f"Duplicate SKU; already on line {seen[sku]}."]}})
+            continue
+        if sku:
+            seen[sku] = line
+
+        form = validate_row(row, existing.get(sku), archive)
+        if not form.is_valid():
+            errors.append({"line": line, "sku": sku, "errors": {field: list(messages) for field, messages in form.errors.items()}})
+            continue
+
+        product = form.save(commit=False)
+        product.seller_id = job.seller_id
+        product.updated_at = now
+        # bulk_update skips pre_save, so store any new image file here.
+        Product._meta.get_field("image").pre_save(product, add=product.pk is None)
+        (updated if product.pk else created).append(product)
+
+    room = max(settings.PRODUCT_IMPORT_MAX_ERRORS - len(job.errors), 0)
+    job.errors += errors[:room]
+    with transaction.atomic():
+        Product.objects.bulk_create(created)
+        Product.objects.bulk_update(updated, UPDATE_FIELDS)
+        ProductImport.objects.filter(id=job.id).update(
+            processed_rows=F("processed_rows") + len(batch),
+            created_count=F("created_count") + len(created),
+            updated_count=F("updated_count") + len(updated),
+            error_count=F("error_count") + len(errors),
+            errors=job.errors,
+            claimed_at=timezone.now(),
+        )
+        groups = [page_cache.CATALOG] + [page_cache.product_group(product.pk) for product in updated]
+        transaction.on_commit(lambda: page_cache.invalidate(*groups))
@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from products import imports
+from products.models import ProductImport
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued bulk product imports. Run one or more of these when PRODUCT_IMPORT_QUEUE=worker; "
+        "each process imports one file at a time, and an interrupted import resumes after its last batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--requeue-after", type=int, default=settings.PRODUCT_IMPORT_REQUEUE_AFTER,
+                            help="Requeue imports that committed no batch for this many seconds (crashed workers).")
+        parser.add_argument("--once", action="store_true", help="Drain the queue and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            requeued = imports.requeue_stale(options["requeue_after"])
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale imports"))
+
+            queued = ProductImport.objects.filter(status=ProductImport.Status.QUEUED).order_by("id").first()
+            if queued is not None:
+                if imports.run_job(queued.id):
+                    queued.refresh_from_db()
+                    self.stdout.write(
+                        f"Import {queued.id}: {queued.status}, {queued.created_count} created, "
+                        f"{queued.updated_count} updated, {queued.error_count} errors"
+                    )
+            elif options["once"]:
+                return
+            else:
+                time.sleep(options["poll_interval"])
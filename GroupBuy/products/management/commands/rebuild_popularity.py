@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from products import popularity
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the decaying trending scores and favorite counts of all products from "
+        "order, review and favorite history (live updates keep them current afterwards)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        scored = popularity.rebuild(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt popularity for {scored} products"))
@@ -0,0 +1,221 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ("products", "0001_initial"),
+        ("products", "0002_product_image"),
+        ("products", "0003_product_seller"),
+        ("products", "0004_remove_product_seller"),
+        ("products", "0005_product_rating"),
+        ("products", "0006_review"),
+        ("products", "0007_product_group_price"),
+        ("products", "0008_remove_product_rating"),
+        ("products", "0009_product_min_participants"),
+        ("products", "0010_product_max_participants"),
+        ("products", "0011_product_favorited_by"),
+        ("products", "0012_product_seller"),
+        ("products", "0013_cartitem_cart"),
+        ("products", "0014_category_remove_product_category_product_categories"),
+        ("products", "0015_remove_product_categories_product_category_and_more"),
+        ("products", "0016_brand_alter_product_brand"),
+        ("products", "0017_alter_product_brand_delete_brand"),
+        ("products", "0018_alter_product_category"),
+        ("products", "0019_brand_alter_product_brand"),
+        ("products", "0020_remove_product_brand_delete_brand"),
+        ("products", "0021_product_brand"),
+        ("products", "0022_pricetier"),
+    ]
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Product",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("description", models.TextField()),
+                ("colour", models.CharField(max_length=225)),
+                ("size", models.CharField(max_length=225)),
+                ("quantity", models.IntegerField()),
+                (
+                    "image",
+                    models.ImageField(
+                        default="images/default.jpg", upload_to="images/"
+                    ),
+                ),
+                (
+                    "group_price",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=10, null=True
+                    ),
+                ),
+                ("min_participants", models.PositiveIntegerField(default=2)),
+                ("max_participants", models.PositiveIntegerField(default=5)),
+                (
+                    "favorited_by",
+                    models.ManyToManyField(
+                        blank=True,
+                        related_name="favorite_products",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "seller",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="products",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("Makeup", "Makeup"),
+                            ("Perfumes", "Perfumes"),
+                            ("Skincare", "Skincare "),
+                            ("Haircare", "Haircare"),
+                            ("Electronics", "Electronics"),
+                        ],
+                        max_length=250,
+                    ),
+                ),
+                ("brand", models.CharField(max_length=225)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Review",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rating", models.SmallIntegerField()),
+                ("comment", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="CartItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField(default=1)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Cart",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("items", models.ManyToManyField(blank=True, to="products.cartitem")),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PriceTier",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("min_participants", models.PositiveIntegerField()),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_tiers",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["product", "min_participants"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product", "min_participants"),
+                        name="unique_product_price_tier",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0021_product_brand"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PriceTier",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("min_participants", models.PositiveIntegerField()),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_tiers",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["product", "min_participants"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("product", "min_participants"),
+                        name="unique_product_price_tier",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:45
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_favorites(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    through = Product.favorited_by.through
+    counts = (
+        through.objects.filter(product_id=OuterRef("pk"))
+        .values("product_id")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    Product.objects.update(favorite_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0023_product_updated_at"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="favorite_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="popularity",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["-popularity"], name="product_popularity_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "-popularity"], name="product_cat_popularity_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["-favorite_count"], name="product_favorites_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "-favorite_count"], name="product_cat_favorites_idx"
+            ),
+        ),
+        migrations.RunPython(count_favorites, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0024_product_popularity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="view_count",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
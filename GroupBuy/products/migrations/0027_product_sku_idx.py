@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0026_product_import"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["sku"], name="product_sku_idx"),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:20
+
+from django.db import migrations
+
+
+def rebuild_scores(apps, schema_editor):
+    # Scores move to log space; recomputing them from history also counts orders
+    # and reviews placed before the popularity field existed.
+    from products import popularity
+
+    popularity.rebuild(apps=apps)
+
+
+def clear_scores(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    Product.objects.update(popularity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0027_product_sku_idx"),
+        ("orders", "0021_admin_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_scores, clear_scores, elidable=True),
+    ]
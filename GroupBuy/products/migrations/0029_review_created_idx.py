@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0028_popularity_log_scale"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(fields=["created_at"], name="review_created_idx"),
+        ),
+    ]
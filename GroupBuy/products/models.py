@@ -1,5 +1,8 @@
+from django.core.validators import FileExtensionValidator
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from main import page_cache
 
 
 
@@ -28,9 +31,60 @@ class Product(models.Model):
   size = models.CharField(max_length=225)
   quantity = models.IntegerField()
   favorited_by = models.ManyToManyField(User, related_name='favorite_products', blank=True)
+  updated_at = models.DateTimeField(auto_now=True, db_index=True)  # drives ETag/Last-Modified on product pages
+  sku = models.CharField(max_length=64, blank=True)  # seller's own code; bulk imports update products by it
+  popularity = models.FloatField(default=0, editable=False)  # decaying trending score, see products/popularity.py
+  favorite_count = models.PositiveIntegerField(default=0, editable=False)
+  view_count = models.PositiveBigIntegerField(default=0, editable=False)  # buffered, see products/view_counter.py
+
+  class Meta:
+    indexes = [
+      models.Index(fields=['-popularity'], name='product_popularity_idx'),
+      models.Index(fields=['category', '-popularity'], name='product_cat_popularity_idx'),
+      models.Index(fields=['-favorite_count'], name='product_favorites_idx'),
+      models.Index(fields=['category', '-favorite_count'], name='product_cat_favorites_idx'),
+      models.Index(fields=['sku'], name='product_sku_idx'),
+    ]
+    constraints = [
+      models.UniqueConstraint(fields=['seller', 'sku'], condition=~models.Q(sku=''), name='product_seller_sku_uniq'),
+    ]
+
+  def __str__(self) -> str:
+    return self.name
+
+  @classmethod
+  def touch(cls, product_id):
+    """Mark a product page as changed when something shown on it (reviews, price tiers) changes."""
+    cls.objects.filter(pk=product_id).update(updated_at=timezone.now())
+    page_cache.invalidate(page_cache.product_group(product_id))
+
+
+
+
+class PriceTier(models.Model):
+  """Group price that applies once a group purchase reaches `min_participants`."""
+  product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='price_tiers')
+  min_participants = models.PositiveIntegerField()
+  price = models.DecimalField(max_digits=10, decimal_places=2)
+
+  class Meta:
+    ordering = ['product', 'min_participants']
+    constraints = [
+      models.UniqueConstraint(fields=['product', 'min_participants'], name='unique_product_price_tier'),
+    ]
+
+  def __str__(self):
+    return f"{self.product.name}: {self.price} from {self.min_participants} participants"
+
+  def save(self, *args, **kwargs):
+    super().save(*args, **kwargs)
+    Product.touch(self.product_id)
+
+  def delete(self, *args, **kwargs):
+    Product.touch(self.product_id)
+    return super().delete(*args, **kwargs)
 
 
-  
 
 class Review(models.Model):
   product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -39,9 +93,22 @@ class Review(models.Model):
   comment = models.TextField()
   created_at = models.DateTimeField(auto_now_add=True)
 
+  class Meta:
+    indexes = [
+      models.Index(fields=['created_at'], name='review_created_idx'),  # admin date_hierarchy
+    ]
+
   def __str__(self):
     return f"{self.user.username} on {self.product.name}"
 
+  def save(self, *args, **kwargs):
+    adding = self._state.adding
+    super().save(*args, **kwargs)
+    Product.touch(self.product_id)
+    if adding:
+      from . import popularity
+      popularity.record(self.product_id, "review")
+
 
 class CartItem(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -63,3 +130,38 @@ class Cart(models.Model):
 
     def total_price(self):
         return sum(item.total_price() for item in self.items.all())
+
+
+
+class ProductImport(models.Model):
+  """A seller's bulk product upload, processed in the background by products/imports.py."""
+  class Status(models.TextChoices):
+    QUEUED = 'queued', 'queued'
+    PROCESSING = 'processing', 'processing'
+    DONE = 'done', 'done'
+    FAILED = 'failed', 'failed'
+
+  seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='product_imports')
+  csv_file = models.FileField(upload_to="imports/", validators=[FileExtensionValidator(['csv'])])
+  images = models.FileField(upload_to="imports/", blank=True, validators=[FileExtensionValidator(['zip'])])
+  status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED, db_index=True)
+  processed_rows = models.PositiveIntegerField(default=0)  # committed with each batch; a requeued import resumes here
+  created_count = models.PositiveIntegerField(default=0)
+  updated_count = models.PositiveIntegerField(default=0)
+  error_count = models.PositiveIntegerField(default=0)
+  errors = models.JSONField(default=list, blank=True)  # the first PRODUCT_IMPORT_MAX_ERRORS row errors
+  failure_reason = models.CharField(max_length=250, blank=True)
+  claimed_at = models.DateTimeField(null=True, blank=True)  # refreshed after every batch
+  created_at = models.DateTimeField(auto_now_add=True)
+  finished_at = models.DateTimeField(null=True, blank=True)
+
+  class Meta:
+    ordering = ['-created_at']
+
+  def __str__(self) -> str:
+    return f"Import {self.id} by {self.seller.username} ({self.status})"
+
+
+def invalidate_product_pages(sender, instance, **kwargs):
+  """post_save/post_delete receiver: drop cached anonymous listing pages and this product's page."""
+  page_cache.invalidate(page_cache.CATALOG, page_cache.product_group(instance.pk))
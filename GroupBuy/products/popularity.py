@@ -0,0 +1,129 @@
+"""
+Decaying popularity scores.
+
+Each event (view, favorite, review, order, group join) is worth
+`weight * 2 ** (hours since EPOCH / half-life)` points. Because every event is
+on the same growing scale, sorting by the sum is the same as sorting by the
+decayed score, so no row ever needs rewriting as time passes.
+
+That scale leaves float range about eight years after EPOCH, so
+`Product.popularity` stores it in log space: `log2(1 + sum)`, which is 0 for a
+product with no events. An event is added with one atomic UPDATE computing
+`log2(2 ** popularity + points)` as `max(a, b) + log2(1 + 2 ** -|a - b|)`,
+which never overflows. `current_score()` converts back to "points as of now".
+
+Top-N lists (`top()`) read the (category, -popularity) and
+(category, -favorite_count) indexes, so their cost depends only on N.
+"""
+
+import math
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Abs, Coalesce, Greatest, Ln, Power
+from django.utils import timezone
+
+from .models import Product, Review
+
+EPOCH = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+WEIGHTS = {
+    "view": 1,
+    "favorite": 5,
+    "review": 5,
+    "order": 10,
+    "group_join": 10,
+}
+
+
+def exponent(when=None):
+    """log2 of an event's multiplier: half-lives from EPOCH to `when`."""
+    hours = ((when or timezone.now()) - EPOCH).total_seconds() / 3600
+    return hours / settings.POPULARITY_HALF_LIFE_HOURS
+
+
+def log_add(a, b):
+    """log2(2 ** a + 2 ** b), without overflow."""
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def with_points(points, when=None):
+    """Expression for `popularity` with `points` earned at `when` added; the SQL form of log_add()."""
+    event = Value(math.log2(points) + exponent(when))
+    return Greatest(F('popularity'), event) + Ln(1 + Power(2, -Abs(F('popularity') - event))) / math.log(2)
+
+
+def current_score(product, now=None):
+    """The product's decayed score in event points as of `now`."""
+    if not product.popularity:
+        return 0.0
+    scale = exponent(now)
+    return 2 ** (product.popularity - scale) - 2 ** -scale
+
+
+def record(product_id, event, count=1, when=None):
+    Product.objects.filter(pk=product_id).update(popularity=with_points(WEIGHTS[event] * count, when))
+
+
+def record_favorite(product_id, added):
+    """Favorites move the exact favorite count both ways; only adding one counts towards trending."""
+    changes = {'favorite_count': F('favorite_count') + (1 if added else -1)}
+    if added:
+        changes['popularity'] = with_points(WEIGHTS["favorite"])
+    Product.objects.filter(pk=product_id).update(**changes)
+
+
+def top(by='popularity', category=None, limit=8, exclude=None):
+    """Top `limit` products by 'popularity' (trending) or 'favorite_count', optionally within a category."""
+    products = Product.objects.filter(**{f'{by}__gt': 0})
+    if category:
+        products = products.filter(category=category)
+    if exclude:
+        products = products.exclude(pk=exclude)
+    return products.order_by(f'-{by}')[:limit]
+
+
+def related(product, limit=4):
+    """Trending products from the same category, topped up with other products from it."""
+    products = list(top(category=product.category, limit=limit, exclude=product.pk))
+    if len(products) < limit:
+        seen = [product.pk] + [related.pk for related in products]
+        products += Product.objects.filter(category=product.category).exclude(pk__in=seen)[:limit - len(products)]
+    return products
+
+
+def rebuild(batch_size=5000, apps=global_apps):
+    """
+    Recompute every score from order and review history, e.g. after bulk imports.
+    Views and favorites carry no timestamp, so views drop out of the score and
+    favorites only refresh `favorite_count`. Returns the number of products with a score.
+    Migrations pass their historical `apps`.
+    """
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('products', 'Review')
+    Order = apps.get_model('orders', 'Order')
+
+    scores = defaultdict(float)
+    orders = Order.objects.values_list('product_id', 'order_type', 'quantity', 'created_at')
+    for product_id, order_type, quantity, created_at in orders.iterator(chunk_size=batch_size):
+        event = "group_join" if order_type == "group" else "order"
+        scores[product_id] = log_add(scores[product_id], math.log2(WEIGHTS[event] * quantity) + exponent(created_at))
+    for product_id, created_at in Review.objects.values_list('product_id', 'created_at').iterator(chunk_size=batch_size):
+        scores[product_id] = log_add(scores[product_id], math.log2(WEIGHTS["review"]) + exponent(created_at))
+
+    favorites = (
+        Product.favorited_by.through.objects.filter(product_id=OuterRef('pk'))
+        .values('product_id').annotate(count=Count('*')).values('count')
+    )
+    with transaction.atomic():
+        Product.objects.update(popularity=0, favorite_count=Coalesce(Subquery(favorites), 0))
+        Product.objects.bulk_update(
+            [Product(pk=product_id, popularity=score) for product_id, score in scores.items()],
+            ['popularity'], batch_size=batch_size,
+        )
+    return len(scores)
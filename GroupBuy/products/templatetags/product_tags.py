@@ -0,0 +1,24 @@
+from django import template
+from django.conf import settings
+from django.template import engines
+from django.utils.safestring import mark_safe
+
+from products.favorites import favorite_ids
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def product_grid(context, products):
+  """
+  Render the product grid (products/product_list.html) with the engine set in LISTING_TEMPLATE_ENGINE.
+  `favorite_ids` (None when the user cannot favorite) marks the hearts without a query per card.
+  """
+  favorites = favorite_ids(context.request)
+  if settings.LISTING_TEMPLATE_ENGINE == "jinja2":
+    grid = engines["jinja2"].get_template("products/product_list.html")
+    return mark_safe(grid.render({'products': products, 'favorite_ids': favorites}, context.request))
+
+  grid = context.template.engine.get_template("products/product_list.html")
+  with context.push(products=products, favorite_ids=favorites):
+    return grid.render(context)
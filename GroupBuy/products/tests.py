@@ -1,3 +1,196 @@
-from django.test import TestCase
+import io
+import zipfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile_User
+
+from main import conditional, page_cache
+
+from orders.models import Order
+from . import favorites, imports, popularity, views
+from .forms import ProductForm, ProductImportForm
+from .models import Product, ProductImport, Review
+
+
+@override_settings(PRODUCT_IMPORT_QUEUE='worker', PRODUCT_IMPORT_REQUEUE_AFTER=600)
+class ImportSweepTest(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user('seller', password='pass-1234')
+
+    def create_import(self, age, **fields):
+        job = ProductImport.objects.create(seller=self.seller, csv_file='imports/products.csv', **fields)
+        ProductImport.objects.filter(id=job.id).update(created_at=timezone.now() - timedelta(seconds=age))
+        return job
+
+    def test_sweep_requeues_stale_imports_and_runs_orphaned_ones(self):
+        orphaned = self.create_import(1200)
+        stale = self.create_import(
+            1200, status=ProductImport.Status.PROCESSING, claimed_at=timezone.now() - timedelta(seconds=1200),
+        )
+        recent = self.create_import(10)
+
+        with mock.patch.object(imports, 'get_executor') as get_executor:
+            self.assertEqual(imports.sweep(), [orphaned.id, stale.id])
+
+        self.assertEqual(get_executor.return_value.submit.call_count, 2)
+        stale.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual(stale.status, ProductImport.Status.QUEUED)
+        self.assertEqual(recent.status, ProductImport.Status.QUEUED)
+
+
+class ProductFormTest(TestCase):
+    def test_counters_are_not_form_fields(self):
+        for name in ('popularity', 'favorite_count', 'view_count'):
+            self.assertNotIn(name, ProductForm.base_fields)
+
+
+class PopularityTest(TestCase):
+    def setUp(self):
+        seller = User.objects.create_user('seller', password='pass-1234')
+        self.first, self.second = [
+            Product.objects.create(
+                seller=seller, name=name, price=10, description='A product', category='Electronics',
+                brand='Acme', colour='Black', size='M', quantity=5,
+            )
+            for name in ('first', 'second')
+        ]
+
+    def test_scores_decay_without_overflowing_decades_after_the_epoch(self):
+        now = datetime(2060, 1, 1, tzinfo=dt_timezone.utc)
+        popularity.record(self.first.id, 'order', when=now)
+        popularity.record(self.first.id, 'view', when=now)
+        popularity.record(self.second.id, 'order', when=now - timedelta(hours=72))
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertAlmostEqual(popularity.current_score(self.first, now), 11)
+        self.assertAlmostEqual(popularity.current_score(self.second, now), 5)
+        self.assertEqual(list(popularity.top()), [self.first, self.second])
+
+    def test_rebuild_recomputes_live_scores_from_history(self):
+        buyer = User.objects.create_user('buyer', password='pass-1234')
+        Order.objects.create(user=buyer, product=self.first, quantity=2, order_type=Order.OrderType.INDIVIDUAL)
+        Review.objects.create(user=buyer, product=self.first, rating=5, comment='Great')
+        live = Product.objects.get(id=self.first.id).popularity
+
+        self.assertEqual(popularity.rebuild(), 1)
+        self.assertAlmostEqual(Product.objects.get(id=self.first.id).popularity, live, places=3)
+        self.assertEqual(Product.objects.get(id=self.second.id).popularity, 0)
+
+
+def images_zip(**members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+@override_settings(PRODUCT_IMPORT_MAX_IMAGE_BYTES=1024, PRODUCT_IMPORT_MAX_ZIP_BYTES=4096, PRODUCT_IMPORT_MAX_CSV_BYTES=4096)
+class ImportUploadLimitTest(TestCase):
+    def form(self, images):
+        return ProductImportForm(files={
+            'csv_file': SimpleUploadedFile('products.csv', b'name,price\n'),
+            'images': SimpleUploadedFile('images.zip', images),
+        })
+
+    def test_zip_with_an_oversized_member_is_rejected_from_its_index(self):
+        # Compresses to a few bytes but unzips past the limit.
+        form = self.form(images_zip(**{'big.jpg': b'0' * 100_000}))
+        self.assertFalse(form.is_valid())
+        self.assertIn('big.jpg', form.errors['images'][0])
+        self.assertTrue(self.form(images_zip(**{'small.jpg': b'0' * 100})).is_valid())
+
+    def test_oversized_zip_and_csv_are_rejected(self):
+        self.assertFalse(self.form(b'0' * 5000).is_valid())
+        form = ProductImportForm(files={'csv_file': SimpleUploadedFile('products.csv', b'0' * 5000)})
+        self.assertIn('csv_file', form.errors)
+
+    def test_rows_naming_an_oversized_image_are_rejected_without_reading_it(self):
+        archive = zipfile.ZipFile(io.BytesIO(images_zip(**{'big.jpg': b'0' * 100_000})))
+        with mock.patch.object(archive, 'read') as read:
+            form = imports.validate_row({'name': 'Kettle', 'image': 'big.jpg'}, None, archive)
+        self.assertIn('image', form.errors)
+        read.assert_not_called()
+
+
+class FavoriteApiTest(TestCase):
+    def setUp(self):
+        self.seller = User.objects.create_user('seller', password='pass-1234')
+        self.products = [
+            Product.objects.create(
+                seller=self.seller, name=f'Kettle {i}', price=10, description='A kettle', category='Electronics',
+                brand='Acme', colour='Black', size='M', quantity=1,
+            )
+            for i in range(4)
+        ]
+        self.buyer = User.objects.create_user('ann', password='pass-1234')
+        Profile_User.objects.create(user=self.buyer)
+
+    def toggle(self, product_id):
+        return self.client.post(reverse('products:toggle_favorite_api_view', args=[product_id]))
+
+    def test_anonymous_users_get_401(self):
+        self.assertEqual(self.toggle(self.products[0].id).status_code, 401)
+
+    def test_users_without_a_shopper_profile_get_403(self):
+        self.client.force_login(self.seller)
+        self.assertEqual(self.toggle(self.products[0].id).status_code, 403)
+        self.assertFalse(favorites.Favorite.objects.exists())
+
+    def test_missing_product_gets_404(self):
+        self.client.force_login(self.buyer)
+        self.assertEqual(self.toggle(self.products[-1].id + 100).status_code, 404)
+
+    def test_toggle_on_then_off(self):
+        self.client.force_login(self.buyer)
+        product = self.products[0]
+
+        self.assertEqual(self.toggle(product.id).json(), {'product_id': product.id, 'favorited': True})
+        self.assertTrue(self.buyer.favorite_products.filter(id=product.id).exists())
+        self.assertEqual(self.toggle(product.id).json(), {'product_id': product.id, 'favorited': False})
+        self.assertFalse(self.buyer.favorite_products.exists())
+
+    def test_hearts_on_every_grid_come_from_one_query(self):
+        self.buyer.favorite_products.add(self.products[0], self.products[2])
+        self.client.force_login(self.buyer)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('main:home_view'))
+
+        favorite_table = favorites.Favorite._meta.db_table
+        self.assertEqual(sum(favorite_table in query['sql'] for query in queries.captured_queries), 1)
+        content = response.content.decode()
+        cards = content.count('data-favorite-url=')
+        self.assertGreaterEqual(cards, len(self.products))
+        self.assertEqual(2 * content.count('bi-heart-fill'), cards)
+
+class AsyncProductDetailTest(TestCase):
+    def test_post_falls_back_to_the_sync_view_without_rerunning_the_decorators(self):
+        seller = User.objects.create_user('seller', password='pass-1234')
+        product = Product.objects.create(
+            seller=seller, name='Kettle', price=10, description='A kettle', category='Electronics',
+            brand='Acme', colour='Black', size='M', quantity=1,
+        )
+        request = RequestFactory().post(f'/products/{product.id}/', {})
+        request.user = AnonymousUser()
+
+        with mock.patch.object(conditional, 'page_validators', wraps=conditional.page_validators) as validators, \
+                mock.patch.object(page_cache, 'lookup', wraps=page_cache.lookup) as lookup:
+            response = async_to_sync(views.async_product_detail_view)(request, product_id=product.id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Kettle')
+        self.assertEqual(validators.call_count, 1)
+        self.assertEqual(lookup.call_count, 1)
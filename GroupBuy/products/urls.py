@@ -1,16 +1,30 @@
 from django.urls import path
+from django.conf import settings
 from . import views
 app_name = 'products'
 
+if settings.ASYNC_READ_VIEWS:
+  all_product_view = views.async_all_product_view
+  product_detail_view = views.async_product_detail_view
+  search_products_view = views.async_search_products_view
+else:
+  all_product_view = views.all_product_view
+  product_detail_view = views.product_detail_view
+  search_products_view = views.search_products_view
+
 urlpatterns = [
   path('create/', views.create_product_view, name='create_product_view'), 
-  path('all/', views.all_product_view, name='all_product_view'),
-  path('detail/<int:product_id>/', views.product_detail_view, name='product_detail_view'),
+  path('import/', views.product_import_view, name='product_import_view'),
+  path('import/<int:import_id>/', views.product_import_detail_view, name='product_import_detail_view'),
+  path('import/<int:import_id>/status/', views.product_import_status_view, name='product_import_status_view'),
+  path('all/', all_product_view, name='all_product_view'),
+  path('detail/<int:product_id>/', product_detail_view, name='product_detail_view'),
   path('update/<product_id>', views.product_update_view, name="product_update_view"), 
   path('delete/<product_id>', views.product_delete_view, name="product_delete_view"), 
-  path("search/", views.search_products_view, name="search_products_view"),
+  path("search/", search_products_view, name="search_products_view"),
   path('review/add/<int:product_id>', views.add_review_view, name='add_review_view'),
   path('toggle-favorite/<int:product_id>/', views.toggle_favorite_view, name='toggle_favorite_view'),
+  path('api/toggle-favorite/<int:product_id>/', views.toggle_favorite_api_view, name='toggle_favorite_api_view'),
   path('favorites/', views.favorite_products_view, name='favorite_products_view'),
   path('cart/', views.cart_view, name='cart_view'), 
   path('add/<int:product_id>/', views.add_to_cart_view, name='add_to_cart_view'),  
@@ -0,0 +1,159 @@
+"""
+Buffered product view counting.
+
+Each worker process keeps its view counts in memory (`ViewBuffer`, guarded by
+a lock) and a daemon thread writes them out every
+`VIEW_COUNTER_FLUSH_INTERVAL` seconds, or sooner once
+`VIEW_COUNTER_MAX_PENDING` views are waiting. A flush is one transaction with
+one UPDATE per distinct increment, adding to `Product.view_count` (seller
+analytics) and the trending score (products/popularity.py), so a page view
+itself never writes to the database.
+
+A crashed worker loses at most the views of one interval (or MAX_PENDING);
+a normal shutdown flushes at exit. A failed flush puts its counts back for
+the next attempt. `stats()` reports the flush lag: how long the oldest
+unwritten view has been waiting.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class ViewBuffer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.counts = Counter()
+        self.pending = 0
+        self.oldest = None  # monotonic time of the oldest unflushed view
+        self.last_flush = None
+        self.last_flush_seconds = 0.0
+        self.flushed = 0
+        self.failures = 0
+        self.pid = None
+
+    def add(self, product_id, count=1):
+        with self.lock:
+            if self.pid != os.getpid():
+                self.start()
+            self.counts[product_id] += count
+            self.pending += count
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+            full = self.pending >= settings.VIEW_COUNTER_MAX_PENDING
+        if full:
+            self.wake.set()
+
+    def start(self):
+        """Start this process's flush thread (again after a fork, where threads do not survive)."""
+        self.pid = os.getpid()
+        threading.Thread(target=self.run, name="view-counter-flush", daemon=True).start()
+
+    def run(self):
+        while True:
+            self.wake.wait(settings.VIEW_COUNTER_FLUSH_INTERVAL)
+            self.wake.clear()
+            close_old_connections()
+            self.flush()
+
+    def take(self):
+        with self.lock:
+            counts, oldest = self.counts, self.oldest
+            self.counts, self.pending, self.oldest = Counter(), 0, None
+        return counts, oldest
+
+    def restore(self, counts, oldest):
+        with self.lock:
+            self.counts.update(counts)
+            self.pending += sum(counts.values())
+            self.oldest = min(filter(None, (self.oldest, oldest)), default=None)
+
+    def flush(self):
+        """Write out the buffered views. Returns the number of views written."""
+        counts, oldest = self.take()
+        if not counts:
+            return 0
+        start = time.monotonic()
+        try:
+            write_views(counts)
+        except Exception:
+            logger.exception("Flushing %d product view counts failed; keeping them for the next flush.", len(counts))
+            self.restore(counts, oldest)
+            self.failures += 1
+            return 0
+        written = sum(counts.values())
+        with self.lock:
+            self.last_flush = time.time()
+            self.last_flush_seconds = time.monotonic() - start
+            self.flushed += written
+        return written
+
+    def stats(self):
+        with self.lock:
+            return {
+                "pending_views": self.pending,
+                "pending_products": len(self.counts),
+                "flush_lag_seconds": time.monotonic() - self.oldest if self.oldest is not None else 0.0,
+                "last_flush": self.last_flush,
+                "last_flush_seconds": self.last_flush_seconds,
+                "flushed_views": self.flushed,
+                "flush_failures": self.failures,
+            }
+
+
+def write_views(counts):
+    """Add {product_id: views} to the products, grouping products that got the same number of views."""
+    from . import popularity
+    from .models import Product
+
+    by_count = defaultdict(list)
+    for product_id, count in counts.items():
+        by_count[count].append(product_id)
+    with transaction.atomic():
+        for count, product_ids in by_count.items():
+            Product.objects.filter(pk__in=product_ids).update(
+                view_count=F('view_count') + count,
+                popularity=popularity.with_points(popularity.WEIGHTS["view"] * count),
+            )
+
+
+buffer = ViewBuffer()
+atexit.register(buffer.flush)
+
+
+def stats():
+    return buffer.stats()
+
+
+def counts_views(view):
+    """
+    Count a view of the `product_id` page for every successful GET, including
+    responses served from the page cache or as 304 Not Modified.
+    """
+    def counted(request, response, product_id):
+        if request.method == "GET" and response.status_code in (200, 304):
+            buffer.add(product_id)
+        return response
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            return counted(request, await view(request, *args, **kwargs), kwargs["product_id"])
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return counted(request, view(request, *args, **kwargs), kwargs["product_id"])
+    return wrapper
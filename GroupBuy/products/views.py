@@ -1,12 +1,50 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, HttpRequest
-from .models import Product, Review, Cart, CartItem
-from .forms import ProductForm
+from django.http import HttpResponse, HttpRequest, Http404, JsonResponse
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
+from .models import Product, ProductImport, Review, Cart, CartItem
+from .forms import ProductForm, ProductImportForm
+from . import favorites, imports, popularity
+from .view_counter import counts_views
 from accounts.models import Profile_Seller, Profile_User
 from django.contrib import messages
 from orders.forms import OrderForm
 from django.db.models import Avg
 from django.db import transaction
+from main.conditional import conditional_page
+from main import page_cache
+from main.page_cache import anonymous_page_cache
+from datetime import datetime, timezone
+from django.conf import settings
+import inspect
+import time
+
+
+def catalog_version(request:HttpRequest, *args, **kwargs):
+  """
+  Version of the product listings: changes whenever a product is added, edited or removed,
+  or the user's favorites (the grid's hearts) change. Products' save/delete and bulk imports
+  replace the catalog's page cache stamp, so no product rows are read.
+  """
+  stamp = page_cache.generation(page_cache.CATALOG)
+  if stamp is None:
+    return None
+  parts = (stamp, favorites.version(request))
+  if not page_cache.is_shared():
+    # Another process's invalidation doesn't reach this one; go stale no longer than its cached pages.
+    parts += (int(time.time() // (settings.PAGE_CACHE_TIMEOUT or 30)),)
+  return parts, datetime.fromtimestamp(stamp / 1e9, timezone.utc)
+
+
+def product_version(request:HttpRequest, product_id:int):
+  """
+  Version of a product page. New reviews and price tier changes touch the product's updated_at.
+  """
+  updated_at = Product.objects.filter(id=product_id).values_list('updated_at', flat=True).first()
+  if updated_at is None:
+    return None
+  return (product_id, updated_at), updated_at
+
 
 def create_product_view(request:HttpRequest):
   """
@@ -38,6 +76,71 @@ def create_product_view(request:HttpRequest):
 
 
 
+def product_import_view(request:HttpRequest):
+  """
+  Lets a seller upload a CSV of products (and a zip of their images) for a background bulk import,
+  and lists their recent imports.
+  """
+  if not request.user.is_authenticated:
+      messages.error(request, "You must be logged in to import products.", "alert-danger")
+      return redirect('accounts:sign_in')
+
+  if not Profile_Seller.objects.filter(user=request.user).exists():
+      messages.error(request, "Only sellers can import products.", "alert-danger")
+      return redirect('main:home_view')
+
+  # Refuse oversized uploads before Django spools them to disk.
+  max_upload = settings.PRODUCT_IMPORT_MAX_CSV_BYTES + settings.PRODUCT_IMPORT_MAX_ZIP_BYTES
+  if request.method == 'POST' and int(request.META.get('CONTENT_LENGTH') or 0) > max_upload:
+    messages.error(request, "The upload is too large.", "alert-danger")
+    return redirect('products:product_import_view')
+
+  import_form = ProductImportForm(request.POST or None, request.FILES or None)
+  if request.method == 'POST' and import_form.is_valid():
+    with transaction.atomic():
+      product_import = import_form.save(commit=False)
+      product_import.seller = request.user
+      product_import.save()
+      imports.enqueue(product_import.id)
+    messages.success(request, "Your file was uploaded. The products are being imported.", "alert-success")
+    return redirect('products:product_import_detail_view', import_id=product_import.id)
+
+  recent_imports = ProductImport.objects.filter(seller=request.user).defer('errors')[:10]
+  return render(request, 'products/product_import.html', {'import_form': import_form, 'recent_imports': recent_imports, 'columns': imports.ROW_FIELDS})
+
+
+def product_import_detail_view(request:HttpRequest, import_id:int):
+  """
+  Progress and per-row errors of one of the seller's imports.
+  """
+  if not request.user.is_authenticated:
+      messages.error(request, "You must be logged in to view imports.", "alert-danger")
+      return redirect('accounts:sign_in')
+
+  product_import = get_object_or_404(ProductImport, id=import_id, seller=request.user)
+  return render(request, 'products/product_import_detail.html', {'product_import': product_import})
+
+
+def product_import_status_view(request:HttpRequest, import_id:int):
+  """
+  JSON progress of an import, polled by the import page.
+  """
+  if not request.user.is_authenticated:
+    return JsonResponse({'error': 'authentication required'}, status=401)
+
+  product_import = get_object_or_404(ProductImport.objects.defer('errors'), id=import_id, seller=request.user)
+  return JsonResponse({
+    'import_id': product_import.id,
+    'status': product_import.status,
+    'processed_rows': product_import.processed_rows,
+    'created': product_import.created_count,
+    'updated': product_import.updated_count,
+    'errors': product_import.error_count,
+  })
+
+
+@anonymous_page_cache("catalog")
+@conditional_page(catalog_version)
 def all_product_view(request:HttpRequest):
   """
   Display a list of all available products.
@@ -49,14 +152,17 @@ def all_product_view(request:HttpRequest):
 
 
 
+@counts_views
+@anonymous_page_cache("product:{product_id}")
+@conditional_page(product_version)
 def product_detail_view(request:HttpRequest, product_id:int):
   """
   Display product details along with its reviews and related products.
   Allows users to place an order from the product detail page.
   """
   product = Product.objects.get(id=product_id)
-  reviews = Review.objects.filter(product=product)
-  related_product = Product.objects.filter(category=product.category).exclude(id=product_id).order_by('?')[:4]
+  reviews = Review.objects.filter(product=product).select_related('user')
+  related_product = popularity.related(product)
 
   form = OrderForm(request.POST or None)
 
@@ -172,19 +278,16 @@ def toggle_favorite_view(request: HttpRequest, product_id: int):
 
 
     try:
-        product = Product.objects.get(id=product_id)
-
-
+        product = Product.objects.only('id').get(id=product_id)
 
-        if product.favorited_by.filter(id=request.user.id).exists():
-            product.favorited_by.remove(request.user)
-            messages.warning(request, "Product removed from favorites.", "alert-warning")
-        else:
-            product.favorited_by.add(request.user)
+        if favorites.toggle(request.user, product.id):
             messages.success(request, "Product added to favorites.", "alert-success")
+        else:
+            messages.warning(request, "Product removed from favorites.", "alert-warning")
 
     except Product.DoesNotExist:
         messages.error(request, "Product not found.", "alert-danger")
+        return redirect('products:all_product_view')
 
     except Exception as e:
         print(e)
@@ -192,6 +295,23 @@ def toggle_favorite_view(request: HttpRequest, product_id: int):
     return redirect("products:product_detail_view", product_id=product.id)
 
 
+@require_POST
+def toggle_favorite_api_view(request: HttpRequest, product_id: int):
+    """
+    JSON version of toggle_favorite_view for the heart buttons on product grids:
+    toggles the favorite and returns the new state instead of redirecting.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'authentication required'}, status=401)
+    if not favorites.can_favorite(request.user):
+        return JsonResponse({'error': 'only users can favorite products'}, status=403)
+    if not Product.objects.filter(id=product_id).exists():
+        return JsonResponse({'error': 'product not found'}, status=404)
+
+    favorited = favorites.toggle(request.user, product_id)
+    return JsonResponse({'product_id': product_id, 'favorited': favorited})
+
+
 
 def favorite_products_view(request: HttpRequest):
     """
@@ -337,6 +457,7 @@ def decrease_cart_quantity_view(request: HttpRequest, product_id: int):
 
 
 
+@conditional_page(catalog_version)
 def search_products_view(request: HttpRequest):
     all_products = Product.objects.all()
 
@@ -360,3 +481,69 @@ def search_products_view(request: HttpRequest):
         'category_filter': category_filter,
         'sort_by_group_price': sort_by_group_price,
     })
+
+
+
+# Async versions of the read-heavy views, routed instead of the sync ones when
+# settings.ASYNC_READ_VIEWS is on (ASGI deployments). Queries use the async ORM;
+# templates still read request.user lazily, so rendering runs via sync_to_async.
+
+@anonymous_page_cache("catalog")
+@conditional_page(catalog_version)
+async def async_all_product_view(request:HttpRequest):
+    """Async version of all_product_view."""
+    products = [product async for product in Product.objects.all()]
+    return await sync_to_async(render)(request, 'products/all_products.html', {'products':products,})
+
+
+
+@counts_views
+@anonymous_page_cache("product:{product_id}")
+@conditional_page(product_version)
+async def async_product_detail_view(request:HttpRequest, product_id:int):
+    """
+    Async version of product_detail_view for GET requests.
+    Other methods fall back to the sync view, which handles the order form.
+    The fallback calls the undecorated view, since this one's decorators already ran.
+    """
+    if request.method != "GET":
+        return await sync_to_async(inspect.unwrap(product_detail_view))(request, product_id=product_id)
+
+    try:
+        product = await Product.objects.aget(id=product_id)
+    except Product.DoesNotExist:
+        raise Http404("Product not found")
+
+    reviews = Review.objects.filter(product=product).select_related('user')
+    review_list = [review async for review in reviews]
+    related_product = await sync_to_async(popularity.related)(product)
+    avg = await reviews.aaggregate(Avg("rating"))
+
+    return await sync_to_async(render)(request, 'products/product_detail.html', {"product":product, 'reviews':review_list, 'related_products': related_product,  'form':OrderForm(), "average_rating":avg["rating__avg"]})
+
+
+
+@conditional_page(catalog_version)
+async def async_search_products_view(request: HttpRequest):
+    """Async version of search_products_view."""
+    all_products = Product.objects.all()
+
+    search_query = request.GET.get('search', '')
+    category_filter = request.GET.get('category', '')
+    sort_by_group_price = request.GET.get('group_price_sort', '')
+
+    if search_query:
+        all_products = all_products.filter(name__icontains=search_query)
+
+    if category_filter:
+        all_products = all_products.filter(category=category_filter)
+
+    if sort_by_group_price:
+        all_products = all_products.filter(group_price__isnull=False).exclude(group_price=0).order_by('group_price')
+
+    return await sync_to_async(render)(request, 'products/search_products.html', {
+        'products': [product async for product in all_products],
+        'search_query': search_query,
+        'category_filter': category_filter,
+        'sort_by_group_price': sort_by_group_price,
+    })